@@ -0,0 +1,91 @@
+"""
+Micro-benchmark des backends de pitch (Aubio / YIN NumPy).
+
+Usage (depuis guitar_trainer/) :
+    python -m src.analysis.bench [--sample-rate 11025] [--window 662] [--frames 2000]
+"""
+import argparse
+import time
+import numpy as np
+
+from .yin import yin_pitch, YinDetector
+
+# Notes de test : de la corde grave (E2) au haut du manche (D6)
+_TEST_FREQS = (82.41, 110.0, 146.83, 196.0, 246.94, 329.63, 440.0, 659.25, 880.0, 1174.66)
+
+
+def _make_frames(sample_rate: int, window: int, frames_per_note: int) -> tuple[np.ndarray, np.ndarray]:
+    """Trames de notes synthétiques (4 harmoniques décroissants + bruit), avec leur f0."""
+    rng = np.random.default_rng(0)
+    t = np.arange(window) / sample_rate
+    frames, truth = [], []
+    for f0 in _TEST_FREQS:
+        phases = rng.uniform(0, 2 * np.pi, (frames_per_note, 1))
+        note = sum(0.6 / h * np.sin(2 * np.pi * f0 * h * t[None, :] + h * phases) for h in range(1, 5))
+        note += 0.01 * rng.standard_normal(note.shape)
+        frames.append(note)
+        truth.append(np.full(frames_per_note, f0))
+    return np.concatenate(frames).astype(np.float32), np.concatenate(truth)
+
+
+def _make_aubio(sample_rate: int, window: int, tolerance: float):
+    try:
+        import aubio
+    except ImportError:
+        return None
+    pitch_o = aubio.pitch("yin", window, window, sample_rate)
+    pitch_o.set_unit("Hz")
+    pitch_o.set_tolerance(tolerance)
+    pitch_o.set_silence(-90.0)
+    return pitch_o
+
+
+def _run_per_frame(detector, frames: np.ndarray) -> tuple[np.ndarray, float]:
+    """Une trame par appel (comme en temps réel). Retourne (f0, secondes)."""
+    out = np.empty(len(frames))
+    start = time.perf_counter()
+    for i, frame in enumerate(frames):
+        out[i] = detector(frame)[0]
+    return out, time.perf_counter() - start
+
+
+def _report(name: str, f0: np.ndarray, truth: np.ndarray, seconds: float) -> None:
+    valid = f0 > 0
+    cents = np.full(len(f0), np.inf)
+    cents[valid] = np.abs(1200 * np.log2(f0[valid] / truth[valid]))
+    gross = np.mean(cents > 50) * 100
+    median = np.median(cents[cents <= 50]) if np.any(cents <= 50) else float("nan")
+    print(f"{name:<16} {seconds / len(f0) * 1e6:8.1f} us/trame | erreur médiane: {median:5.2f} cents "
+          f"| erreurs grossières (>50 cents): {gross:5.1f} %")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark des backends de pitch")
+    parser.add_argument("--sample-rate", type=int, default=11025)
+    parser.add_argument("--window", type=int, default=662)
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    frames, truth = _make_frames(args.sample_rate, args.window, max(1, args.frames // len(_TEST_FREQS)))
+    print(f"[BENCH] {len(frames)} trames de {args.window} @ {args.sample_rate}Hz")
+
+    aubio_o = _make_aubio(args.sample_rate, args.window, args.tolerance)
+    if aubio_o is not None:
+        f0, seconds = _run_per_frame(aubio_o, frames)
+        _report("aubio (trame)", f0, truth, seconds)
+    else:
+        print(f"{'aubio':<16} non installé")
+
+    numpy_o = YinDetector(args.sample_rate, args.tolerance, 40.0, 2000.0)
+    f0, seconds = _run_per_frame(numpy_o, frames)
+    _report("numpy (trame)", f0, truth, seconds)
+
+    start = time.perf_counter()
+    f0, _ = yin_pitch(frames, args.sample_rate, args.tolerance, 40.0, 2000.0)
+    _report("numpy (lot)", f0, truth, time.perf_counter() - start)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
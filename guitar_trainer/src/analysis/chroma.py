@@ -0,0 +1,156 @@
+from functools import lru_cache
+import numpy as np
+from .pitch import NOTE_NAMES
+from .decimator import DecimatedHistory
+
+# Plage de fréquences prise en compte : fondamentales graves et harmoniques utiles des accords
+CHROMA_FMIN = 60.0
+CHROMA_FMAX = 4000.0
+# Fréquence d'échantillonnage visée pour l'analyse des accords (flux décimé)
+_ANALYSIS_RATE = 11025
+
+# Qualités d'accords reconnues : suffixe du nom -> intervalles (demi-tons depuis la fondamentale)
+CHORD_QUALITIES = {
+    "": (0, 4, 7),
+    "m": (0, 3, 7),
+    "7": (0, 4, 7, 10),
+    "m7": (0, 3, 7, 10),
+    "maj7": (0, 4, 7, 11),
+    "5": (0, 7),
+    "sus2": (0, 2, 7),
+    "sus4": (0, 5, 7),
+}
+
+# Harmoniques prises en compte dans les gabarits, et décroissance de leur poids
+_TEMPLATE_HARMONICS = 6
+_HARMONIC_DECAY = 0.6
+
+# Noms alternatifs des notes altérées (ex: "Bb" -> "A#")
+_FLATS = {"Db": "C#", "Eb": "D#", "Gb": "F#", "Ab": "G#", "Bb": "A#"}
+
+
+@lru_cache(maxsize=8)
+def chroma_matrix(sample_rate: int, n_fft: int) -> np.ndarray:
+    """
+    Matrice (12, n_fft/2+1) qui projette un spectre de magnitude sur les 12 classes de hauteur.
+
+    Chaque bin FFT entre CHROMA_FMIN et CHROMA_FMAX est réparti sur les classes voisines de sa
+    hauteur par une gaussienne (distance circulaire en demi-tons), d'autant plus large que la
+    résolution de la FFT est grossière à cette fréquence ; les bins imprécis pèsent moins.
+    Calculée une seule fois par (sample rate, taille de FFT).
+    """
+    freqs = np.arange(n_fft // 2 + 1) * sample_rate / n_fft
+    valid = (freqs >= CHROMA_FMIN) & (freqs <= CHROMA_FMAX)
+    f = freqs[valid]
+    semitone = 12.0 * np.log2(f / 440.0) + 9.0  # 0 = C
+    # Largeur d'un bin FFT, en demi-tons, à cette fréquence
+    width = np.maximum(1.0, 12.0 * np.log2((f + sample_rate / n_fft / 2) / (f - sample_rate / n_fft / 2)))
+
+    classes = np.arange(12)
+    dist = (semitone[None, :] - classes[:, None] + 6.0) % 12.0 - 6.0
+    weights = np.exp(-0.5 * (dist / (0.5 * width[None, :]))**2)
+    weights /= np.sum(weights, axis=0, keepdims=True) * width[None, :]
+
+    matrix = np.zeros((12, len(freqs)), dtype=np.float32)
+    matrix[:, valid] = weights
+    matrix.flags.writeable = False
+    return matrix
+
+
+def canonical_chord(name: str) -> str:
+    """Nom d'accord normalisé, tel que rapporté par le détecteur : 'Bbm' -> 'A#m', 'E' -> 'E'."""
+    root = name[:2] if len(name) > 1 and name[1] in "#b" else name[:1]
+    quality = name[len(root):]
+    root = _FLATS.get(root, root)
+    if root not in NOTE_NAMES or quality not in CHORD_QUALITIES:
+        raise ValueError(f"Unknown chord: {name}")
+    return root + quality
+
+
+@lru_cache(maxsize=1)
+def chord_templates() -> tuple[tuple[str, ...], np.ndarray]:
+    """
+    Noms et matrice (n_accords, 12) des gabarits d'accords, normalisés (norme 1) : le produit
+    avec un chroma normalisé donne directement la similarité cosinus de chaque accord.
+    """
+    # Profil harmonique d'une note : un spectre de guitare contient aussi les quintes (h=3),
+    # tierces majeures (h=5)... de chaque note, que le gabarit doit prévoir
+    harmonics = np.arange(1, _TEMPLATE_HARMONICS + 1)
+    offsets = np.round(12.0 * np.log2(harmonics)).astype(int) % 12
+    decay = _HARMONIC_DECAY ** (harmonics - 1)
+
+    names, rows = [], []
+    for quality, intervals in CHORD_QUALITIES.items():
+        for root, note in enumerate(NOTE_NAMES):
+            row = np.zeros(12)
+            for i in intervals:
+                np.add.at(row, (root + i + offsets) % 12, decay)
+            names.append(note + quality)
+            rows.append(row / np.linalg.norm(row))
+    templates = np.array(rows, dtype=np.float32)
+    templates.flags.writeable = False
+    return tuple(names), templates
+
+
+def normalize_chroma(chroma: np.ndarray) -> np.ndarray:
+    """Normalise chaque chroma (dernière dimension) à la norme 1 ; un chroma nul reste nul."""
+    norm = np.linalg.norm(chroma, axis=-1, keepdims=True)
+    return np.divide(chroma, norm, out=np.zeros_like(chroma), where=norm > 0)
+
+
+class ChordDetector:
+    """
+    Reconnaissance d'accords sur les `window` derniers échantillons du flux décimé.
+
+    La FFT d'un bloc (23 ms) ne sépare pas les demi-tons des cordes graves : le détecteur garde
+    son propre historique, décimé (filtre anti-repliement) vers ~11 kHz, et analyse une fenêtre
+    de Hann d'environ 190 ms à chaque bloc. Seuls les pics du spectre sont projetés sur le
+    chroma (matrice précalculée), qui est comparé à tous les gabarits en un produit
+    matrice-vecteur. Un accord n'est rapporté qu'après `confirm_blocks` blocs consécutifs où il
+    est le meilleur gabarit avec une similarité d'au moins `min_score`.
+    """
+
+    def __init__(self, sample_rate: int, window_ms: float, min_score: float, confirm_blocks: int):
+        self.history = DecimatedHistory(sample_rate, _ANALYSIS_RATE, CHROMA_FMAX, window_ms)
+        self.min_score = min_score
+        self.confirm_blocks = confirm_blocks
+        self.names, self.templates = chord_templates()
+        self._chroma_matrix = chroma_matrix(int(round(self.history.rate)), self.history.size)
+        self._window = np.hanning(self.history.size).astype(np.float32)
+        self.reset()
+
+    def reset(self) -> None:
+        self._candidate = None
+        self._count = 0
+
+    def push(self, samples: np.ndarray) -> None:
+        """Ajoute un bloc à l'historique, sans analyse (silence)."""
+        self.history.push(samples)
+
+    def chroma(self) -> np.ndarray:
+        """Chroma normalisé (12,) de la fenêtre courante."""
+        magnitude = np.abs(np.fft.rfft(self.history.data * self._window))
+        # Pics seulement : les fuites spectrales autour des partiels ne comptent pas
+        peaks = np.zeros(len(magnitude), dtype=bool)
+        peaks[1:-1] = (magnitude[1:-1] >= magnitude[:-2]) & (magnitude[1:-1] >= magnitude[2:])
+        return normalize_chroma(self._chroma_matrix @ (magnitude * peaks))
+
+    def process(self, samples: np.ndarray) -> tuple[str | None, float]:
+        """Ajoute un bloc et retourne (accord confirmé ou None, similarité du meilleur gabarit)."""
+        self.push(samples)
+        chroma = self.chroma()
+        if not np.any(chroma):
+            self.reset()
+            return None, 0.0
+
+        scores = self.templates @ chroma
+        best = int(np.argmax(scores))
+        score = float(scores[best])
+        if score < self.min_score:
+            self.reset()
+            return None, score
+
+        name = self.names[best]
+        self._count = self._count + 1 if name == self._candidate else 1
+        self._candidate = name
+        return (name if self._count >= self.confirm_blocks else None), score
@@ -0,0 +1,85 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Longueur du filtre anti-repliement, par unité de facteur de décimation
+_TAPS_PER_FACTOR = 16
+
+
+def choose_decimation_factor(sample_rate: int, target_rate: int, fmax: float) -> int:
+    """
+    Plus grand facteur entier qui ramène le flux vers `target_rate` tout en gardant `fmax`
+    sous la bande passante du filtre (45 % de la nouvelle fréquence d'échantillonnage).
+    """
+    by_target = sample_rate // max(1, target_rate)
+    by_fmax = int(sample_rate * 0.45 // fmax) if fmax > 0 else by_target
+    return max(1, min(by_target, by_fmax))
+
+
+class Decimator:
+    """
+    Décimation par un facteur entier avec filtre passe-bas FIR (sinc fenêtré, Blackman).
+
+    Le filtre n'est évalué qu'aux échantillons conservés : un produit matrice-vecteur sur les
+    fenêtres glissantes, sans boucle Python. L'historique (taps - 1 échantillons) et la phase
+    sont conservés entre blocs : la sortie est continue quelle que soit la taille des blocs.
+    """
+
+    def __init__(self, factor: int):
+        if factor < 1:
+            raise ValueError("Decimation factor must be at least 1")
+        self.factor = factor
+        n_taps = _TAPS_PER_FACTOR * factor + 1
+        n = np.arange(n_taps) - (n_taps - 1) / 2.0
+        cutoff = 0.45 / factor  # en cycles par échantillon d'entrée
+        kernel = 2.0 * cutoff * np.sinc(2.0 * cutoff * n) * np.blackman(n_taps)
+        kernel /= np.sum(kernel)
+        # Noyau symétrique : la corrélation des fenêtres avec le noyau est la convolution
+        self._kernel = kernel.astype(np.float32)
+        # Retard de groupe du filtre (échantillons d'entrée) : la sortie décrit le flux d'il y a `delay`
+        self.delay = 0 if factor == 1 else (n_taps - 1) // 2
+        self.reset()
+
+    def reset(self) -> None:
+        self._history = np.zeros(len(self._kernel) - 1, dtype=np.float32)
+        self._phase = 0  # début (dans l'historique) de la prochaine fenêtre à évaluer
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        if self.factor == 1:
+            return samples.astype(np.float32, copy=False)
+        if len(samples) == 0:
+            # Bloc vide : rien à évaluer, historique et phase inchangés
+            return np.zeros(0, dtype=np.float32)
+
+        n_taps = len(self._kernel)
+        data = np.concatenate([self._history, samples.astype(np.float32, copy=False)])
+        windows = sliding_window_view(data, n_taps)[self._phase::self.factor]
+        out = windows @ self._kernel
+
+        keep_from = len(data) - (n_taps - 1)
+        self._phase += len(windows) * self.factor - keep_from
+        self._history = data[keep_from:]
+        return out
+
+
+class DecimatedHistory:
+    """
+    Derniers `window_ms` du flux, décimé vers ~`target_rate` (sans replier jusqu'à `fmax`) :
+    fenêtre glissante pour les analyses qui ont besoin d'une meilleure résolution fréquentielle
+    qu'un bloc, à coût réduit.
+    """
+
+    def __init__(self, sample_rate: int, target_rate: int, fmax: float, window_ms: float):
+        factor = choose_decimation_factor(sample_rate, target_rate, fmax)
+        self.decimator = Decimator(factor)
+        self.rate = sample_rate / factor
+        self.size = max(2, int(window_ms / 1000.0 * self.rate))
+        self.data = np.zeros(self.size, dtype=np.float32)
+
+    def push(self, samples: np.ndarray) -> None:
+        decimated = self.decimator.process(samples)
+        n = len(decimated)
+        if n >= self.size:
+            np.copyto(self.data, decimated[n - self.size:])
+        elif n > 0:
+            self.data[:-n] = self.data[n:]
+            self.data[-n:] = decimated
@@ -1,67 +1,260 @@
+from dataclasses import replace
 import numpy as np
 from ..core.config import AppConfig
-from ..core.types import AudioBlock, Features
-from .pitch import PitchTracker
+from ..core.types import AudioBlock, Features, PitchFrame, PitchResult
+from .pitch import PitchTracker, note_name_to_hz
 from .stability import StabilityTracker
+from .spectrum import SILENCE_RMS, BlockSpectrum, SpectrumBatch
+from .goertzel import GoertzelBank
+from .onset import OnsetDetector
+from .logspec import LogFrequencyKernel, get_log_kernel
+from .chroma import ChordDetector
+from .templates import TemplateMatcher
 
 
 
+# Résultat de pitch des blocs silencieux (aucune analyse)
+_SILENT_PITCH = PitchResult(0.0, 0.0, None, 0.0)
+
+
+def _readonly(array: np.ndarray) -> np.ndarray:
+    """Verrouille un tableau en écriture : il est partagé tel quel entre threads."""
+    array.flags.writeable = False
+    return array
+
+
+class _Confirmation:
+    """Compte, pour chaque cible, les blocs consécutifs où elle est reconnue."""
+
+    def __init__(self, required_blocks: int):
+        self.required_blocks = required_blocks
+        self._counts = {}
+
+    def update(self, targets, raw) -> tuple:
+        """Cibles reconnues sur au moins `required_blocks` blocs consécutifs."""
+        self._counts = {t: self._counts.get(t, 0) + 1 if t in raw else 0 for t in targets}
+        return tuple(t for t in targets if self._counts[t] >= self.required_blocks)
+
+
 class FeatureExtractor:
     def __init__(self, cfg):
         self.cfg = cfg
         # On ré-intègre les trackers ici pour que la classe soit autonome
         self.pitch_tracker = PitchTracker(cfg)
-        self.stability_tracker = StabilityTracker(cfg)
+        # Une frame de stabilité par résultat de pitch (un hop)
+        self.stability_tracker = StabilityTracker(cfg, self.pitch_tracker.hop_seconds)
+        # Dernier pitch et dernier verdict de stabilité : conservés si un bloc ne complète aucune fenêtre
+        self._last_pitch = _SILENT_PITCH
+        self._stable = False
+        self.onset_detector = OnsetDetector(cfg.sample_rate, cfg.onset_window_size, cfg.onset_hop_size,
+                                            cfg.onset_threshold, cfg.rms_threshold,
+                                            min_interval_ms=cfg.onset_min_interval_ms)
+        # Attaques : seulement utiles au jeu (timing des quêtes), activées par le contrôleur
+        self._onsets_enabled = False
+
+        # Mode "goertzel" : détecteurs à bande étroite sur les notes attendues par le jeu
+        self.hit_bank = None
+        if cfg.hit_detector == "goertzel":
+            window = int(cfg.goertzel_window_ms / 1000.0 * cfg.sample_rate)
+            self.hit_bank = GoertzelBank(cfg.sample_rate, window)
+        self._note_confirmation = _Confirmation(cfg.goertzel_confirm_blocks)
+
+        # Mode "template" : profils spectraux des samples enregistrés par le Studio
+        self.template_matcher = None
+        if cfg.hit_detector == "template":
+            self.template_matcher = TemplateMatcher(cfg.sample_rate, cfg.samples_dir,
+                                                    cfg.template_window_ms, cfg.template_min_score)
+        self._position_confirmation = _Confirmation(cfg.template_confirm_blocks)
+
+        # Accords : détecteur chroma, actif en mode polyphonique ou pendant une quête d'accords.
+        # Créé à la première activation
+        self.chord_detector = None
+        self._chords_enabled = False
+        self.set_chord_detection(False)
+
+    def _log_kernel(self, n_samples: int) -> LogFrequencyKernel | None:
+        """Noyau du spectrogramme logarithmique pour des blocs de `n_samples` (calculé une fois)."""
+        if n_samples < 2:
+            return None
+        cfg = self.cfg
+        return get_log_kernel(cfg.sample_rate, n_samples, note_name_to_hz(cfg.spectrogram_fmin_note),
+                              note_name_to_hz(cfg.spectrogram_fmax_note), cfg.spectrogram_bins_per_semitone)
+
+    def set_expected_notes(self, notes: list[str]) -> None:
+        """
+        Notes attendues (cibles du jeu ou du studio), la plus proche en premier : oriente le
+        choix de fenêtre du pitch et accorde le banc de détecteurs.
+        """
+        self.pitch_tracker.set_register_hint(note_name_to_hz(notes[0]) if notes else None)
+        if self.hit_bank is not None:
+            self.hit_bank.set_targets(notes)
+
+    def set_expected_positions(self, positions: list[tuple[int, int]]) -> None:
+        """Positions (corde, case) attendues : seuls leurs gabarits sont comparés au signal."""
+        if self.template_matcher is not None:
+            self.template_matcher.set_targets(positions)
+
+    def refresh_templates(self) -> None:
+        """Recalcule les gabarits des samples nouveaux ou modifiés (hors jeu : lecture des WAV)."""
+        if self.template_matcher is not None:
+            self.template_matcher.refresh()
+
+    def set_chord_detection(self, enabled: bool) -> None:
+        """Active la reconnaissance d'accords (toujours active avec `polyphonic`)."""
+        enabled = enabled or self.cfg.polyphonic
+        if enabled and not self._chords_enabled:
+            if self.chord_detector is None:
+                cfg = self.cfg
+                self.chord_detector = ChordDetector(cfg.sample_rate, cfg.chord_window_ms,
+                                                    cfg.chord_min_score, cfg.chord_confirm_blocks)
+            self.chord_detector.reset()
+        self._chords_enabled = enabled
+
+    def set_onset_detection(self, enabled: bool) -> None:
+        """Active la détection des attaques (quête en cours) ; inutile en studio ou à l'accordeur."""
+        if enabled and not self._onsets_enabled:
+            self.onset_detector.reset()
+        self._onsets_enabled = enabled
 
     def process(self, audio_block) -> Features:
         """Analyse complète d'un bloc audio."""
         samples = audio_block.samples
-        
-        # 1. Calcul du Pitch (On utilise le bon nom de méthode : process)
-        pitch_result = self.pitch_tracker.process(audio_block)
+
+        # 2. Calcul du volume (RMS). Le spectre n'est calculé que si quelqu'un le lit
+        rms = float(np.sqrt(np.mean(samples**2))) if len(samples) > 0 else 0.0
+        spectral = BlockSpectrum.single(samples, rms, self._log_kernel(len(samples)))
+        return self._finish(audio_block, rms, spectral)
+
+    def process_batch(self, audio_blocks) -> list[Features]:
+        """
+        Analyse de plusieurs blocs en attente (rattrapage après un retard).
+        RMS puis, si besoin, spectres et flatness sont calculés en une passe vectorisée sur les
+        blocs empilés ; le pitch et la stabilité, qui ont un état, avancent bloc par bloc.
+        """
+        if not audio_blocks:
+            return []
+        if len(audio_blocks) == 1 or len({len(b.samples) for b in audio_blocks}) != 1:
+            return [self.process(b) for b in audio_blocks]
+
+        frames = np.stack([b.samples for b in audio_blocks])
+        rms = np.sqrt(np.mean(frames**2, axis=1))
+        batch = SpectrumBatch(frames, rms, self._log_kernel(frames.shape[1]))
+        return [self._finish(b, float(rms[i]), BlockSpectrum(batch, i)) for i, b in enumerate(audio_blocks)]
+
+    def _is_voiced(self, pitch_result: PitchResult, rms: float, spectral: BlockSpectrum) -> bool:
+        # Indicateurs binaires. La pureté (flatness, donc la FFT du bloc) n'est évaluée
+        # que si les autres conditions sont déjà remplies
+        return ((pitch_result.frequency > 0) and (pitch_result.confidence > self.cfg.confidence_threshold)
+                and (rms > self.cfg.rms_threshold) and spectral.flatness < self.cfg.flatness_threshold)
+
+    def _track_frames(self, results: list[PitchResult], rms: float, spectral: BlockSpectrum) -> tuple:
+        """Une PitchFrame par fenêtre analysée, chacune passée au suivi de stabilité."""
+        frames = []
+        for result in results:
+            is_voiced = self._is_voiced(result, rms, spectral)
+            frame = PitchFrame(
+                sample_index=result.sample_index,
+                f0_hz=result.frequency,
+                confidence=result.confidence,
+                note_name=result.note_name if is_voiced else None,
+                cents=result.cents,
+                is_voiced=is_voiced
+            )
+            self._stable = self.stability_tracker.update(frame)
+            frames.append(replace(frame, stable=self._stable))
+        return tuple(frames)
+
+    def _finish(self, audio_block, rms: float, spectral: BlockSpectrum) -> Features:
+        """Étapes avec état (pitch, stabilité) et construction des Features d'un bloc."""
+        # 1. Calcul du Pitch (un résultat par hop), sauf sous le seuil RMS : le bloc ne peut pas
+        # être "voiced", on saute le pitch (le tracker garde le bloc pour rester cohérent au retour du son)
+        if rms <= self.cfg.rms_threshold:
+            self.pitch_tracker.skip(audio_block)
+            self.stability_tracker.reset()
+            self._stable = False
+            results = []
+            self._last_pitch = _SILENT_PITCH
+        else:
+            results = self.pitch_tracker.process(audio_block)
+            if results:
+                self._last_pitch = results[-1]
+        pitch_frames = self._track_frames(results, rms, spectral)
+
+        # Valeurs du bloc (affichage) : la fenêtre la plus récente
+        pitch_result = self._last_pitch
         f0 = pitch_result.frequency
         conf = pitch_result.confidence
-        
-        # 2. Calcul du volume (RMS)
-        rms = np.sqrt(np.mean(samples**2)) if len(samples) > 0 else 0.0
-
-        # 3. Calcul de la Pureté (Flatness)
-        flatness = 1.0
-        power_spectrum = np.zeros(len(samples)//2 + 1)
-        if len(samples) > 0 and rms > 1e-5:
-            fft_magnitude = np.abs(np.fft.rfft(samples))
-            power_spectrum = fft_magnitude**2
-            power_spectrum = np.where(power_spectrum == 0, 1e-10, power_spectrum)
-            arithmetic_mean = np.mean(power_spectrum)
-            geometric_mean = np.exp(np.mean(np.log(power_spectrum)))
-            flatness = geometric_mean / arithmetic_mean
-
-        # 4. Indicateurs binaires
-        is_pure = flatness < self.cfg.flatness_threshold
-        is_voiced = (f0 > 0) and (conf > self.cfg.confidence_threshold) and (rms > self.cfg.rms_threshold) and is_pure
+        is_voiced = pitch_frames[-1].is_voiced if pitch_frames else self._is_voiced(pitch_result, rms, spectral)
 
         # CORRECTION : Si le son n'est pas "voiced" (volume trop bas, etc.), on efface la note
         final_note_name = pitch_result.note_name if is_voiced else None
 
-        # 5. Création de l'objet Features temporaire
-        feats_temp = Features(
+        target_matches = self._match_targets(audio_block.samples, rms)
+
+        onset_index = self._detect_onset(audio_block, rms)
+
+        position_matches = self._match_positions(audio_block.samples, rms)
+
+        chord, chord_score = self._detect_chord(audio_block.samples, rms)
+
+        # 5. Création de l'objet Features
+        return Features(
             timestamp=audio_block.timestamp,
             f0_hz=f0,
             note_name=final_note_name,
             cents=pitch_result.cents,
             rms=rms,
-            flatness=flatness,
             raw_f0=f0,
             raw_confidence=conf,
             is_voiced=is_voiced,
-            is_pure=is_pure,
-            spectrum=power_spectrum,
-            samples=samples,
-            stable=False
+            samples=_readonly(audio_block.samples),
+            sample_index=audio_block.sample_index,
+            spectral=spectral,
+            flatness_threshold=self.cfg.flatness_threshold,
+            target_matches=target_matches,
+            onset_index=onset_index,
+            position_matches=position_matches,
+            template_targets=self.template_matcher.get_targets() if self.template_matcher else (),
+            chord=chord,
+            chord_score=chord_score,
+            pitch_frames=pitch_frames,
+            # 6. Stabilité : suivie fenêtre par fenêtre, état après la plus récente
+            stable=self._stable,
+            stability=self.stability_tracker.stats()
         )
 
-        # 6. Calcul de la Stabilité
-        stable = self.stability_tracker.update(feats_temp)
-        feats_temp.stable = stable
+    def _detect_onset(self, audio_block, rms: float) -> int | None:
+        if not self._onsets_enabled:
+            return None
+        # Attaque : analysée sur tous les blocs (elle démarre souvent dans un bloc encore calme)
+        onset = self.onset_detector.process(audio_block.samples, silent=rms <= SILENCE_RMS)
+        return audio_block.sample_index + onset if onset is not None else None
+
+    def _match_positions(self, samples: np.ndarray, rms: float) -> tuple:
+        """Positions reconnues par les gabarits sur `template_confirm_blocks` blocs consécutifs."""
+        return self._confirmed_matches(self.template_matcher, self._position_confirmation, samples, rms)
+
+    def _detect_chord(self, samples: np.ndarray, rms: float) -> tuple[str | None, float]:
+        if not self._chords_enabled:
+            return None, 0.0
+        if rms <= self.cfg.rms_threshold:
+            self.chord_detector.push(samples)
+            self.chord_detector.reset()
+            return None, 0.0
+        return self.chord_detector.process(samples)
+
+    def _match_targets(self, samples: np.ndarray, rms: float) -> tuple:
+        """Notes attendues reconnues par le banc sur `goertzel_confirm_blocks` blocs consécutifs."""
+        return self._confirmed_matches(self.hit_bank, self._note_confirmation, samples, rms)
 
-        return feats_temp
+    def _confirmed_matches(self, detector, confirmation: _Confirmation, samples: np.ndarray, rms: float) -> tuple:
+        """Détecteur de cibles (banc Goertzel ou gabarits) : bloc analysé puis confirmation."""
+        if detector is None:
+            return ()
+        if rms <= self.cfg.rms_threshold:
+            # Silence : historique alimenté, rien de reconnu
+            detector.push(samples)
+            raw = ()
+        else:
+            raw = detector.process(samples)
+        return confirmation.update(detector.get_targets(), raw)
@@ -0,0 +1,40 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class AnalysisFramer:
+    """
+    Redécoupe le flux audio en fenêtres d'analyse qui se chevauchent, avec un pas (hop)
+    indépendant de la taille des blocs du callback.
+
+    Chaque appel à push() renvoie toutes les fenêtres complétées par le bloc, sous forme d'un
+    tableau (n_fenêtres, window_size) (vue, sans copie des fenêtres). Comme le buffer interne
+    d'Aubio, l'historique démarre sur des zéros : une première fenêtre sort dès le premier hop.
+    """
+
+    def __init__(self, window_size: int, hop_size: int):
+        if hop_size <= 0 or window_size < hop_size:
+            raise ValueError("Analysis window must be at least one hop long")
+        self.window_size = window_size
+        self.hop_size = hop_size
+        self.reset()
+
+    def reset(self) -> None:
+        self._data = np.zeros(self.window_size - self.hop_size, dtype=np.float32)
+        # Fin de chaque fenêtre rendue par le dernier push(), en échantillons depuis le début du bloc
+        self.window_ends = np.zeros(0, dtype=np.int64)
+
+    def push(self, samples: np.ndarray) -> np.ndarray:
+        data = np.concatenate([self._data, samples.astype(np.float32, copy=False)])
+        if len(data) < self.window_size:
+            self._data = data
+            self.window_ends = np.zeros(0, dtype=np.int64)
+            return np.zeros((0, self.window_size), dtype=np.float32)
+
+        n_windows = (len(data) - self.window_size) // self.hop_size + 1
+        windows = sliding_window_view(data, self.window_size)[::self.hop_size][:n_windows]
+
+        history = len(data) - len(samples)
+        self.window_ends = np.arange(n_windows) * self.hop_size + self.window_size - history
+        self._data = data[n_windows * self.hop_size:]
+        return windows
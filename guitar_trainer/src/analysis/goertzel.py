@@ -0,0 +1,123 @@
+import numpy as np
+from .pitch import note_name_to_hz
+
+SEMITONE = 2 ** (1 / 12)
+
+
+class GoertzelBank:
+    """
+    Banc de détecteurs à bande étroite accordés sur les notes attendues (mode jeu).
+
+    Pour chaque note cible on évalue, comme des filtres de Goertzel, l'énergie :
+      - de la fondamentale et des harmoniques de la note ;
+      - des mêmes harmoniques un demi-ton en dessous et au-dessus (voisins à rejeter) ;
+      - de la sous-octave (f/2, 3f/2) : rejette la note jouée une octave plus bas.
+    Les noyaux (exponentielles complexes fenêtrées, parties réelle et imaginaire séparées)
+    sont précalculés dans une matrice, appliquée en un seul produit matrice-vecteur par bloc
+    sur l'historique récent. La fenêtre de chaque note est juste assez longue pour séparer
+    les demi-tons, dans la limite de `max_window` échantillons.
+    """
+
+    def __init__(self, sample_rate: int, max_window: int, n_harmonics: int = 4,
+                 neighbour_ratio: float = 4.0, min_energy_ratio: float = 0.25):
+        self.sample_rate = sample_rate
+        self.max_window = max_window
+        self.n_harmonics = n_harmonics
+        self.neighbour_ratio = neighbour_ratio
+        self.min_energy_ratio = min_energy_ratio
+
+        self._history = np.zeros(max_window, dtype=np.float32)
+        # note -> (noyaux (2 * lignes, max_window), masque des harmoniques séparables, longueur)
+        self._kernel_cache = {}
+        self._targets = ()
+        self._matrix = None
+        self._masks = None
+        self._lengths = None
+
+    def set_targets(self, notes) -> None:
+        """Notes à surveiller ; la matrice n'est reconstruite que si la liste change."""
+        targets = tuple(notes)
+        if targets == self._targets:
+            return
+        self._targets = targets
+        if not targets:
+            self._matrix = None
+            return
+        kernels = [self._get_kernels(note) for note in targets]
+        self._matrix = np.concatenate([k for k, _, _ in kernels])
+        self._masks = np.stack([m for _, m, _ in kernels])
+        self._lengths = np.array([length for _, _, length in kernels])
+
+    def get_targets(self) -> tuple:
+        return self._targets
+
+    def push(self, samples: np.ndarray) -> None:
+        """Ajoute un bloc à l'historique, sans analyse (silence)."""
+        n = len(samples)
+        if n >= self.max_window:
+            np.copyto(self._history, samples[n - self.max_window:])
+        elif n > 0:
+            self._history[:-n] = self._history[n:]
+            self._history[-n:] = samples
+
+    def process(self, samples: np.ndarray) -> tuple[str, ...]:
+        """Ajoute un bloc et retourne les notes cibles reconnues dans l'historique récent."""
+        self.push(samples)
+        if self._matrix is None:
+            return ()
+
+        n_rows = 3 * self.n_harmonics + 2
+        proj = self._matrix @ self._history
+        power = (proj[0::2]**2 + proj[1::2]**2).reshape(len(self._targets), n_rows)
+
+        h = self.n_harmonics
+        target = power[:, :h]
+        masks = self._masks
+        e_target = np.sum(target, axis=1)
+        e_lower = np.sum(power[:, h:2 * h] * masks, axis=1)
+        e_upper = np.sum(power[:, 2 * h:3 * h] * masks, axis=1)
+        e_sub = np.sum(power[:, 3 * h:], axis=1)
+        e_resolved = np.sum(target * masks, axis=1)
+
+        # Énergie du signal sur la fenêtre de chaque note. Une sinusoïde d'amplitude A a une
+        # puissance moyenne A²/2 ; les noyaux sont normalisés pour renvoyer A²
+        recent_energy = np.cumsum(self._history[::-1]**2, dtype=np.float64)
+        signal = 2.0 * recent_energy[self._lengths - 1] / self._lengths
+        matched = (
+            (e_target > self.min_energy_ratio * signal)
+            & (e_resolved > self.neighbour_ratio * np.maximum(e_lower, e_upper))
+            & (e_target > self.neighbour_ratio * e_sub)
+            & (target[:, 0] > 0.1 * e_target)
+        )
+        return tuple(note for note, ok in zip(self._targets, matched) if ok)
+
+    def _get_kernels(self, note: str):
+        cached = self._kernel_cache.get(note)
+        if cached is not None:
+            return cached
+
+        f0 = note_name_to_hz(note)
+        h = np.arange(1, self.n_harmonics + 1)
+        freqs = np.concatenate([f0 * h, f0 / SEMITONE * h, f0 * SEMITONE * h, [f0 / 2, 1.5 * f0]])
+
+        # Fenêtre de Hann : lobe principal de ±2 bins. Longueur suffisante pour séparer la
+        # fondamentale de ses voisins, sinon (notes graves) seules les harmoniques séparables
+        # sont comparées aux voisins
+        gap = f0 * (SEMITONE - 1)
+        length = int(min(self.max_window, np.ceil(2.0 * self.sample_rate / gap)))
+        resolution = 2.0 * self.sample_rate / length
+        mask = (gap * h >= resolution).astype(np.float32)
+        if not mask.any():
+            mask[-1] = 1.0
+
+        window = np.hanning(length)
+        t = np.arange(length) / self.sample_rate
+        phase = 2.0 * np.pi * freqs[:, None] * t[None, :]
+        scale = 2.0 / np.sum(window)
+        kernels = np.zeros((2 * len(freqs), self.max_window), dtype=np.float32)
+        kernels[0::2, self.max_window - length:] = np.cos(phase) * window * scale
+        kernels[1::2, self.max_window - length:] = np.sin(phase) * window * scale
+
+        cached = (kernels, mask, length)
+        self._kernel_cache[note] = cached
+        return cached
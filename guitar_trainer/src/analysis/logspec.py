@@ -0,0 +1,61 @@
+from functools import lru_cache
+import numpy as np
+
+
+class LogFrequencyKernel:
+    """
+    Banc de filtres en fréquence logarithmique (façon CQT) appliqué à un spectre de puissance.
+
+    Bins centrés sur fmin * 2^(k / bins_per_semitone), jusqu'à fmax. Chaque bin est la moyenne
+    pondérée (fenêtre triangulaire en log-fréquence, d'un bin voisin à l'autre) des bins FFT qui
+    tombent dans sa bande. Dans le grave, où la bande contient moins de deux bins FFT, le bin est
+    interpolé linéairement entre les deux bins FFT qui encadrent sa fréquence centrale.
+
+    Le noyau est creux : seules les entrées non nulles (ligne, colonne, poids) sont stockées,
+    triées par ligne, et appliquées en une multiplication + somme par segments (un bloc ou un lot).
+    """
+
+    def __init__(self, sample_rate: int, n_fft: int, fmin: float, fmax: float, bins_per_semitone: int):
+        self.sample_rate = sample_rate
+        self.n_fft = n_fft
+        n_out = int(round(12 * bins_per_semitone * np.log2(fmax / fmin))) + 1
+        self.frequencies = fmin * 2.0 ** (np.arange(n_out) / (12.0 * bins_per_semitone))
+
+        n_in = n_fft // 2 + 1
+        fft_freqs = np.arange(n_in) * sample_rate / n_fft
+        # Distance (en bins de sortie) entre chaque bin FFT et chaque centre
+        with np.errstate(divide="ignore"):
+            dist = 12.0 * bins_per_semitone * np.abs(np.log2(fft_freqs[None, :] / self.frequencies[:, None]))
+        weights = np.maximum(0.0, 1.0 - dist)
+
+        rows, cols, values = [], [], []
+        for k, f in enumerate(self.frequencies):
+            nz = np.flatnonzero(weights[k])
+            if len(nz) < 2:
+                # Bande plus étroite que la résolution : interpolation entre les bins FFT voisins
+                pos = min(f * n_fft / sample_rate, n_in - 1.0)
+                lo = min(int(pos), n_in - 2)
+                nz = np.array([lo, lo + 1])
+                w = np.array([lo + 1 - pos, pos - lo])
+            else:
+                w = weights[k, nz]
+            rows.append(np.full(len(nz), k))
+            cols.append(nz)
+            values.append(w / np.sum(w))
+
+        self.n_bins = n_out
+        self._cols = np.concatenate(cols)
+        self._values = np.concatenate(values).astype(np.float32)
+        # Début du segment de chaque ligne (chaque ligne a au moins une entrée)
+        self._starts = np.flatnonzero(np.diff(np.concatenate([[-1], np.concatenate(rows)])))
+
+    def apply(self, power: np.ndarray) -> np.ndarray:
+        """Spectre(s) de puissance (..., n_fft/2+1) -> puissance par bin logarithmique (..., n_bins)."""
+        return np.add.reduceat(power[..., self._cols] * self._values, self._starts, axis=-1)
+
+
+@lru_cache(maxsize=8)
+def get_log_kernel(sample_rate: int, n_fft: int, fmin: float, fmax: float,
+                   bins_per_semitone: int) -> LogFrequencyKernel:
+    """Noyau calculé une seule fois par configuration (sample rate, taille de FFT, plage)."""
+    return LogFrequencyKernel(sample_rate, n_fft, fmin, fmax, bins_per_semitone)
@@ -0,0 +1,94 @@
+import numpy as np
+from .framer import AnalysisFramer
+
+# Durée de la moyenne glissante du flux qui sert de seuil adaptatif
+_AVERAGE_MS = 250.0
+
+
+class OnsetDetector:
+    """
+    Détection des attaques par flux spectral, avec une résolution d'un hop (quelques ms).
+
+    Le flux est découpé en fenêtres de `window_size` échantillons tous les `hop_size`
+    (AnalysisFramer), indépendamment des blocs du callback. Toutes les fenêtres d'un bloc
+    passent en une seule FFT vectorisée. Pour chaque fenêtre t :
+        L_t = log(max(|X_t|², plancher))
+        flux_t = moyenne sur les bins de max(0, L_t - L_t-lag)
+    Le plancher correspond à un bruit blanc au niveau `floor_rms` (le seuil RMS de l'app) :
+    le bruit de fond ne produit pas de flux. La comparaison se fait avec la fenêtre qui ne
+    chevauche pas (lag = window / hop), pour que l'attaque ne soit pas diluée sur plusieurs hops.
+
+    Une attaque est détectée quand le flux franchit (front montant) le seuil
+        threshold + ratio * moyenne récente du flux,
+    au plus une fois par `min_interval_ms`. Causal : aucune latence ajoutée.
+    """
+
+    def __init__(self, sample_rate: int, window_size: int, hop_size: int, threshold: float,
+                 floor_rms: float, ratio: float = 1.5, min_interval_ms: float = 50.0):
+        self.sample_rate = sample_rate
+        self.window_size = window_size
+        self.hop_size = hop_size
+        self.threshold = threshold
+        self.ratio = ratio
+        self.min_interval = int(min_interval_ms / 1000.0 * sample_rate)
+        self.framer = AnalysisFramer(window_size, hop_size)
+        self._window = np.hanning(window_size).astype(np.float32)
+        self._log_floor = float(np.log(max(floor_rms**2 * np.sum(self._window**2), 1e-20)))
+        self._lag = max(1, window_size // hop_size)
+        self._average_len = max(1, int(_AVERAGE_MS / 1000.0 * sample_rate / hop_size))
+        self.reset()
+
+    def reset(self) -> None:
+        self.framer.reset()
+        # Log-spectres des `lag` dernières fenêtres, et derniers flux (du plus ancien au plus récent)
+        self._past = np.full((self._lag, self.window_size // 2 + 1), self._log_floor, dtype=np.float32)
+        self._recent = np.zeros(self._average_len)
+        self._above = False
+        self._position = 0              # échantillons reçus depuis le reset
+        self._last_onset = -self.min_interval
+
+    def process(self, samples: np.ndarray, silent: bool = False) -> int | None:
+        """
+        Ajoute un bloc. Retourne la position de la première attaque dans le bloc (en
+        échantillons depuis son début, éventuellement négative de moins d'un hop), ou None.
+        Un bloc `silent` (sous le plancher) alimente l'historique sans FFT.
+        """
+        windows = self.framer.push(samples)
+        ends = self.framer.window_ends
+        block_start = self._position
+        self._position += len(samples)
+        n = len(windows)
+        if n == 0:
+            return None
+        if silent:
+            self._past[:] = self._log_floor
+            self._recent = np.concatenate([self._recent, np.zeros(n)])[-self._average_len:]
+            self._above = False
+            return None
+
+        power = np.abs(np.fft.rfft(windows * self._window, axis=1))**2
+        logs = np.log(np.maximum(power, np.exp(self._log_floor))).astype(np.float32)
+        history = np.concatenate([self._past, logs])
+        flux = np.mean(np.maximum(logs - history[:n], 0.0), axis=1)
+        self._past = history[-self._lag:]
+
+        # Seuil adaptatif : moyenne des `_average_len` flux précédant chaque fenêtre
+        fluxes = np.concatenate([self._recent, flux])
+        cumsum = np.concatenate([[0.0], np.cumsum(fluxes)])
+        k = len(self._recent) + np.arange(n)
+        average = (cumsum[k] - cumsum[k - self._average_len]) / self._average_len
+        self._recent = fluxes[-self._average_len:]
+
+        above = flux > self.threshold + self.ratio * average
+        rising = above & ~np.concatenate([[self._above], above[:-1]])
+        self._above = bool(above[-1])
+
+        onset = None
+        for i in np.flatnonzero(rising):
+            # La nouveauté est entrée par le dernier hop de la fenêtre : on date l'attaque en son milieu
+            offset = int(ends[i]) - self.hop_size // 2
+            if block_start + offset - self._last_onset >= self.min_interval:
+                self._last_onset = block_start + offset
+                if onset is None:
+                    onset = offset
+        return onset
@@ -1,54 +1,215 @@
 import numpy as np
-import aubio
+from numpy.lib.stride_tricks import sliding_window_view
 from ..core.config import AppConfig
 from ..core.types import PitchResult
+from .framer import AnalysisFramer
+from .decimator import Decimator, choose_decimation_factor
+from .yin import YinDetector
 import math
 
+# Candidat de la fenêtre courte proche de la note attendue : seuil de confiance réduit
+_HINT_TOLERANCE_CENTS = 100.0
+_HINT_CONFIDENCE_RATIO = 0.5
+# Candidat court retenu seulement s'il confirme l'estimation précédente ou la fenêtre longue
+_AGREEMENT_CENTS = 100.0
+
+
+def _agrees(freq_hz: float, reference_hz: float) -> bool:
+    """Deux fréquences à moins d'un demi-ton l'une de l'autre (une octave ou un harmonique non)."""
+    return freq_hz > 0 and reference_hz > 0 and abs(1200.0 * math.log2(freq_hz / reference_hz)) <= _AGREEMENT_CENTS
+
+
 class PitchTracker:
     def __init__(self, cfg: AppConfig):
         self.cfg = cfg
-        # Buffer size (Fenêtre d'analyse)
-        self.buf_size = cfg.block_size * 2
-        self.hop_size = cfg.block_size
+        # Chemin d'analyse décimé : les fondamentales de guitare restent sous fmax, inutile
+        # de faire tourner YIN à 44.1/48 kHz. Filtre anti-repliement puis sous-échantillonnage
+        self.decimation = choose_decimation_factor(cfg.sample_rate, cfg.pitch_sample_rate, cfg.fmax)
+        self.decimator = Decimator(self.decimation)
+        self.analysis_rate = cfg.sample_rate / self.decimation
+
+        # Fenêtre d'analyse (en ms) et pas (hop, en échantillons d'entrée) indépendants de la
+        # taille des blocs audio : le framer redécoupe le flux décimé, Aubio reçoit des fenêtres
+        self.buf_size = int(round(cfg.pitch_window_ms / 1000.0 * self.analysis_rate))
+        self.hop_size = max(1, cfg.analysis_hop_size // self.decimation)
+        self.framer = AnalysisFramer(self.buf_size, self.hop_size)
         
+        # hop = fenêtre : chaque appel analyse une fenêtre entière, sans état caché dans Aubio
+        self.pitch_o = self._create_pitch(self.buf_size)
+
+        # Multi-résolution : une fenêtre courte (fin de la fenêtre longue) résout vite les
+        # aigus ; la fenêtre longue n'est calculée que si le candidat est grave ou douteux
+        self.short_size = 0
+        self.short_o = None
+        if cfg.pitch_multires:
+            self.short_size = min(self.buf_size, int(round(cfg.pitch_short_window_ms / 1000.0 * self.analysis_rate)))
+            self.short_o = self._create_pitch(self.short_size)
+        # Fréquence attendue (note cible du jeu), None si inconnue
+        self._register_hint = None
+        # Dernière estimation fiable (Hz), 0 si aucune : valide le candidat de la fenêtre courte
+        self._previous_f0 = 0.0
+        # Flux non décimé récent (fenêtre longue + retard du filtre) : le délai trouvé sur le flux
+        # décimé y est affiné, sans quoi les aigus (périodes de quelques échantillons) sortent faux
+        self._raw = np.zeros((self.buf_size + 1) * self.decimation + self.decimator.delay, dtype=np.float32)
+
+    @property
+    def hop_seconds(self) -> float:
+        """Durée d'un hop : intervalle entre deux résultats de pitch."""
+        return self.hop_size * self.decimation / self.cfg.sample_rate
+
+    def _create_pitch(self, size: int):
+        if self.cfg.pitch_backend == "numpy":
+            # YIN en NumPy (autocorrélation par FFT) : pas besoin d'Aubio
+            return YinDetector(self.analysis_rate, self.cfg.confidence_threshold, self.cfg.fmin, self.cfg.fmax)
+
+        # Import paresseux : Aubio n'est requis qu'avec le backend "aubio"
+        import aubio
+
         # 1. CHANGEMENT ALGO : On passe de "yinfft" (Spectral) à "yin" (Temporel)
         # "yin" est beaucoup plus stable pour la guitare et la voix.
-        self.pitch_o = aubio.pitch("yin", self.buf_size, self.hop_size, cfg.sample_rate)
-        
-        self.pitch_o.set_unit("Hz")
+        pitch_o = aubio.pitch("yin", size, size, int(round(self.analysis_rate)))
+        pitch_o.set_unit("Hz")
         
         # Tolérance de l'algorithme (0.15 est un bon standard pour Yin)
         # On utilise la valeur de config si elle est proche, sinon 0.15 par défaut
-        self.pitch_o.set_tolerance(cfg.confidence_threshold)
+        pitch_o.set_tolerance(self.cfg.confidence_threshold)
         
         # 2. CHANGEMENT SILENCE : On ouvre les vannes (-90dB)
         # On ne veut pas qu'Aubio décide ce qui est du silence, c'est le rôle du RMS dans features.py
-        self.pitch_o.set_silence(-90.0)
+        pitch_o.set_silence(-90.0)
+        return pitch_o
 
-    def process(self, audio_block) -> PitchResult:
-        """Process an audio block to extract pitch info."""
-        # CORRECTION : On extrait le tableau numpy de l'objet AudioBlock
-        # et on le convertit en float32 pour Aubio
-        samples = audio_block.samples.astype('float32')
+    def set_register_hint(self, freq_hz: float | None) -> None:
+        """Registre attendu : une cible grave passe directement par la fenêtre longue."""
+        self._register_hint = freq_hz
 
-        # Aubio nécessite que le bloc fasse exactement la taille 'hop_size'
-        if samples.shape[0] != self.hop_size:
-            return PitchResult(0.0, 0.0, None, 0.0)
+    def skip(self, audio_block) -> None:
+        """Bloc ignoré (silence) : on alimente seulement l'historique (décimateur, framer), sans analyse."""
+        self._push_raw(audio_block.samples)
+        self.framer.push(self.decimator.process(audio_block.samples))
+        self._previous_f0 = 0.0
 
-        # Calcul du pitch avec Aubio
-        pitch = self.pitch_o(samples)[0]
-        confidence = self.pitch_o.get_confidence()
-        
+    def _push_raw(self, samples: np.ndarray) -> np.ndarray:
+        """Ajoute le bloc à l'historique non décimé ; renvoie historique + bloc."""
+        data = np.concatenate([self._raw, samples.astype(np.float32, copy=False)])
+        self._raw = data[len(data) - len(self._raw):]
+        return data
+
+    def process(self, audio_block) -> list[PitchResult]:
+        """
+        Analyse toutes les fenêtres complétées par le bloc : un résultat par hop, dans l'ordre,
+        daté par la fin de sa fenêtre (index d'échantillon du flux, à un échantillon décimé près).
+        Le bloc peut avoir n'importe quelle taille ; il peut ne compléter aucune fenêtre.
+        """
+        raw = self._push_raw(audio_block.samples)
+        decimated = self.decimator.process(audio_block.samples)
+        windows = self.framer.push(decimated)
+        if len(windows) == 0:
+            return []
+        block_end = audio_block.sample_index + len(audio_block.samples)
+        ends = block_end - (len(decimated) - self.framer.window_ends) * self.decimation
+        f0, confidence, sizes = self._analyse(windows)
+        if self.decimation > 1:
+            # Fin de chaque fenêtre dans `raw`, décalée du retard du filtre anti-repliement
+            self._refine(f0, raw, len(raw) - (block_end - ends) - self.decimator.delay, sizes)
+        return [self._result(f, c, int(end)) for f, c, end in zip(f0, confidence, ends)]
+
+    def _analyse(self, windows: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (f0, confiance, taille de la fenêtre analysée) de chaque fenêtre : toutes les fenêtres
+        du bloc forment un seul lot.
+        """
+        sizes = np.full(len(windows), self.buf_size)
+        split = self.cfg.pitch_register_split_hz
+        hint = self._register_hint
+        if self.short_o is None or (hint is not None and hint < split):
+            f0, confidence = self._run(self.pitch_o, windows)
+            self._remember(f0[-1], confidence[-1])
+            return f0, confidence, sizes
+
+        f0, confidence = self._run(self.short_o, windows[:, -self.short_size:])
+        thresholds = np.array([self._short_threshold(f) for f in f0])
+        # Fenêtre longue seulement pour les candidats graves ou douteux
+        retry = ~((f0 >= split) & (confidence > thresholds))
+        if np.any(retry):
+            f0[retry], confidence[retry] = self._run(self.pitch_o, windows[retry])
+        sizes[~retry] = self.short_size
+
+        # Le candidat court (1 à 2 périodes dans le grave) peut sauter sur un harmonique : il
+        # doit confirmer l'estimation précédente ou, à défaut, la fenêtre longue, qui l'emporte sinon
+        for i in np.flatnonzero(~retry):
+            if i > 0:
+                self._remember(f0[i - 1], confidence[i - 1])
+            if _agrees(f0[i], self._previous_f0):
+                continue
+            long_f0, long_confidence = self._run(self.pitch_o, windows[i:i + 1])
+            if not _agrees(f0[i], long_f0[0]):
+                f0[i], confidence[i], sizes[i] = long_f0[0], long_confidence[0], self.buf_size
+        self._remember(f0[-1], confidence[-1])
+        return f0, confidence, sizes
+
+    def _remember(self, freq_hz: float, confidence: float) -> None:
+        """Estimation de référence pour la fenêtre suivante : ignorée si elle n'est pas fiable."""
+        self._previous_f0 = float(freq_hz) if confidence > self.cfg.confidence_threshold else 0.0
+
+    def _refine(self, f0: np.ndarray, raw: np.ndarray, stops: np.ndarray, sizes: np.ndarray) -> None:
+        """
+        Affine en place chaque f0 sur le flux non décimé : minimum de la fonction de différence
+        YIN à ± un facteur de décimation du délai trouvé, puis interpolation parabolique à pleine
+        résolution. La recherche reste au voisinage du délai : l'octave choisie ne change pas.
+        """
+        sample_rate = self.cfg.sample_rate
+        factor = self.decimation
+        for i in np.flatnonzero(f0 > 0):
+            size = int(sizes[i]) * factor
+            stop = int(stops[i])
+            if stop - size < 0:
+                continue
+            x = raw[stop - size:stop].astype(np.float64)
+            w = size // 2
+            tau = int(sample_rate / f0[i])
+            lags = np.arange(max(1, tau - factor - 1), tau + factor + 3)
+            if lags[-1] + w > size:
+                continue
+            d = np.sum((sliding_window_view(x, w)[lags] - x[:w]) ** 2, axis=1)
+            k = int(np.argmin(d[1:-1])) + 1
+            a, b, c = d[k - 1], d[k], d[k + 1]
+            den = a - 2.0 * b + c
+            shift = 0.5 * (a - c) / den if abs(den) > 1e-12 else 0.0
+            f0[i] = sample_rate / (lags[k] + min(1.0, max(-1.0, shift)))
+
+    def _short_threshold(self, freq_hz: float) -> float:
+        """Confiance requise du candidat court : réduite s'il est proche de la note attendue."""
+        threshold = self.cfg.confidence_threshold
+        hint = self._register_hint
+        if hint is not None and freq_hz > 0 and abs(1200.0 * math.log2(freq_hz / hint)) <= _HINT_TOLERANCE_CENTS:
+            return threshold * _HINT_CONFIDENCE_RATIO
+        return threshold
+
+    def _run(self, pitch_o, windows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        if isinstance(pitch_o, YinDetector):
+            # YIN NumPy : tout le lot en un passage vectorisé
+            return pitch_o.batch(windows)
+        # Aubio : une fenêtre par appel, en tableau float32 contigu de la taille de la fenêtre
+        f0 = np.empty(len(windows))
+        confidence = np.empty(len(windows))
+        for i, window in enumerate(windows):
+            f0[i] = pitch_o(np.ascontiguousarray(window))[0]
+            confidence[i] = pitch_o.get_confidence()
+        return f0, confidence
+
+    def _result(self, pitch: float, confidence: float, sample_index: int) -> PitchResult:
         note_name = None
         cents = 0.0
         if pitch > 0:
             note_name, cents = self._hz_to_note(pitch)
             
         return PitchResult(
-            frequency=pitch,
-            confidence=confidence,
+            frequency=float(pitch),
+            confidence=float(confidence),
             note_name=note_name,
-            cents=cents
+            cents=cents,
+            sample_index=sample_index
         )
     
     def _hz_to_note(self, f0: float) -> tuple[str, float]:
@@ -68,4 +229,14 @@ class PitchTracker:
         note_name = names[rounded_midi % 12]
         octave = (rounded_midi // 12) - 1
         
-        return f"{note_name}{octave}", cents
\ No newline at end of file
+        return f"{note_name}{octave}", cents
+
+
+NOTE_NAMES = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
+
+
+def note_name_to_hz(note_name: str) -> float:
+    """Fréquence (Hz) d'un nom de note du type 'E2', 'C#3' (A4 = 440Hz)."""
+    name, octave = note_name[:-1], int(note_name[-1])
+    midi = NOTE_NAMES.index(name) + (octave + 1) * 12
+    return 440.0 * 2 ** ((midi - 69) / 12)
\ No newline at end of file
@@ -0,0 +1,85 @@
+import numpy as np
+from .logspec import LogFrequencyKernel
+
+# En dessous de ce RMS, un bloc est considéré silencieux : spectre nul, flatness 1.0
+SILENCE_RMS = 1e-5
+
+
+class SpectrumBatch:
+    """
+    Spectres de puissance d'un groupe de blocs de même taille, calculés à la demande.
+
+    Rien n'est calculé à la construction : le premier accès fait la FFT de tous les blocs en
+    une passe vectorisée, puis le résultat est mis en cache et partagé par tous les lecteurs.
+    Deux threads qui y accèdent en même temps peuvent refaire le calcul, sans incohérence.
+    """
+
+    def __init__(self, frames: np.ndarray, rms: np.ndarray, log_kernel: LogFrequencyKernel | None = None):
+        self._frames = frames
+        self._rms = rms
+        self._log_kernel = log_kernel
+        self._power = None
+        self._log_power = None
+        self._flatness = None
+
+    def power(self) -> np.ndarray:
+        if self._power is None and self._frames.shape[1] == 0:
+            self._power = np.zeros((len(self._frames), 1))
+        if self._power is None:
+            power = np.abs(np.fft.rfft(self._frames, axis=1))**2
+            power = np.where(power == 0, 1e-10, power)
+            silent = self._rms <= SILENCE_RMS
+            if np.any(silent):
+                power[silent] = 0.0
+            power.flags.writeable = False
+            self._power = power
+        return self._power
+
+    def log_power(self) -> np.ndarray | None:
+        """Puissance par bin logarithmique (noyau appliqué à tout le lot en une passe)."""
+        if self._log_power is None and self._log_kernel is not None:
+            log_power = self._log_kernel.apply(self.power())
+            log_power.flags.writeable = False
+            self._log_power = log_power
+        return self._log_power
+
+    def flatness(self) -> np.ndarray:
+        if self._flatness is None:
+            power = self.power()
+            silent = self._rms <= SILENCE_RMS
+            safe = np.where(silent[:, None], 1.0, power)
+            flatness = np.exp(np.mean(np.log(safe), axis=1)) / np.mean(safe, axis=1)
+            flatness[silent] = 1.0
+            self._flatness = flatness
+        return self._flatness
+
+
+class BlockSpectrum:
+    """Vue paresseuse sur le spectre d'un bloc d'un SpectrumBatch."""
+
+    def __init__(self, batch: SpectrumBatch, row: int):
+        self._batch = batch
+        self._row = row
+
+    @classmethod
+    def single(cls, samples: np.ndarray, rms: float,
+               log_kernel: LogFrequencyKernel | None = None) -> "BlockSpectrum":
+        return cls(SpectrumBatch(samples[None, :], np.array([rms]), log_kernel), 0)
+
+    @property
+    def power(self) -> np.ndarray:
+        """Spectre de puissance |rfft|² (lecture seule)."""
+        return self._batch.power()[self._row]
+
+    @property
+    def log_power(self) -> np.ndarray | None:
+        """Puissance par bin logarithmique (lecture seule), None sans noyau."""
+        log_power = self._batch.log_power()
+        return log_power[self._row] if log_power is not None else None
+
+    @property
+    def flatness(self) -> float:
+        return float(self._batch.flatness()[self._row])
+
+    def is_computed(self) -> bool:
+        return self._batch._power is not None
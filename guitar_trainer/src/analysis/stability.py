@@ -1,33 +1,168 @@
-import time
 from collections import deque
-from ..core.types import Features
+import numpy as np
+from ..core.types import PitchFrame, StabilityStats
+
+# Amplitude minimale (cents) d'un aller-retour pour compter un extremum de vibrato
+_VIBRATO_HYSTERESIS_CENTS = 3.0
+
 
 class StabilityTracker:
-    def __init__(self, cfg):
+    """
+    Statistiques glissantes de l'écart (cents) sur les `stable_window_ms` dernières frames voisées.
+    Une frame est une fenêtre de pitch (un hop, de durée `frame_period`).
+
+    Tout est mis à jour en O(1) par bloc, quelle que soit la longueur de la fenêtre :
+      - anneau numpy de taille fixe pour les valeurs (et les extrema de vibrato) qui sortent ;
+      - files monotones pour le max de |cents| et le min/max de cents ;
+      - moyenne/variance de Welford (ajout et retrait) ;
+      - sommes de la régression linéaire pour la dérive (cents/s) ;
+      - extrema (avec hystérésis) pour la fréquence et la profondeur du vibrato.
+    """
+
+    def __init__(self, cfg, frame_period: float | None = None):
         self.cfg = cfg
-        self.buffer = deque()
+        # Durée d'une frame : le hop du pitch, ou un bloc audio à défaut
+        self.frame_period = frame_period if frame_period is not None else cfg.block_size / cfg.sample_rate
         # Calcul du nombre de frames nécessaires pour la fenêtre de temps
-        self.required_frames = int((cfg.stable_window_ms / 1000.0) * (cfg.sample_rate / cfg.block_size))
+        self.required_frames = max(1, int((cfg.stable_window_ms / 1000.0) / self.frame_period))
+        self._values = np.zeros(self.required_frames)
+        self._turns = np.zeros(self.required_frames, dtype=bool)
+        self._swings = np.full(self.required_frames, np.nan)
+        self.reset()
 
-    def update(self, feats: Features) -> bool:
+    def reset(self) -> None:
+        self._count = 0      # frames dans la fenêtre
+        self._index = 0      # index de la prochaine frame (depuis le dernier reset)
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._sum_xy = 0.0   # sum(k * cents), k = index de frame
+        self._abs_max = deque()  # (index, |cents|) décroissants
+        self._max = deque()      # (index, cents) décroissants
+        self._min = deque()      # (index, cents) croissants
+        self._n_turns = 0
+        self._n_swings = 0       # extrema précédés d'un autre extremum (amplitude connue)
+        self._swing_sum = 0.0    # somme des |extremum - extremum précédent|
+        self._turns[:] = False
+        self._swings[:] = np.nan
+        self._direction = 0      # +1 montée, -1 descente, 0 inconnu
+        self._peak = 0.0         # extremum courant (pas encore confirmé)
+        self._peak_index = 0
+        self._last_turn = None   # valeur du dernier extremum confirmé
+
+    def update(self, frame: PitchFrame) -> bool:
         # RÉACTION IMMÉDIATE : Si les conditions des potards ne sont plus remplies
         # (Volume trop bas ou Son trop sale), on vide le tampon instantanément.
-        if not feats.is_voiced:
-            self.buffer.clear()
+        if not frame.is_voiced:
+            self.reset()
             return False
 
-        # Ajout de l'écart (cents) actuel
-        self.buffer.append(feats.cents)
-
-        # On garde uniquement la fenêtre définie dans la config
-        if len(self.buffer) > self.required_frames:
-            self.buffer.popleft()
+        self._push(frame.cents)
 
         # Pour être stable, il faut avoir assez de données et être dans la tolérance
-        if len(self.buffer) < self.required_frames:
+        if self._count < self.required_frames:
             return False
+        if self._abs_max[0][1] > self.cfg.stable_cents_tolerance:
+            return False
+        max_std = self.cfg.stable_max_std_cents
+        return max_std <= 0 or self.std() <= max_std
+
+    def _push(self, cents: float) -> None:
+        n = self.required_frames
+        k = self._index
+        slot = k % n
+
+        # Retrait de la valeur qui sort de la fenêtre
+        if self._count == n:
+            old = self._values[slot]
+            old_mean = self._mean
+            self._mean -= (old - old_mean) / (n - 1) if n > 1 else old_mean
+            self._m2 -= (old - old_mean) * (old - self._mean)
+            self._sum_xy -= (k - n) * old
+            self._count -= 1
+            if self._turns[slot]:
+                self._n_turns -= 1
+            if not np.isnan(self._swings[slot]):
+                self._n_swings -= 1
+                self._swing_sum -= self._swings[slot]
+        self._turns[slot] = False
+        self._swings[slot] = np.nan
+
+        # Ajout (Welford)
+        self._values[slot] = cents
+        self._count += 1
+        delta = cents - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (cents - self._mean)
+        self._sum_xy += k * cents
+
+        # Files monotones : les éléments dominés ne peuvent plus être l'extremum
+        for queue, value, keep in ((self._abs_max, abs(cents), 1), (self._max, cents, 1), (self._min, cents, -1)):
+            while queue and (queue[-1][1] - value) * keep <= 0:
+                queue.pop()
+            queue.append((k, value))
+            if queue[0][0] <= k - n:
+                queue.popleft()
+
+        self._track_turn(cents, k)
+        self._index += 1
+
+    def _track_turn(self, cents: float, k: int) -> None:
+        """Détection d'extrema avec hystérésis : un retour de plus de quelques cents confirme le pic."""
+        if self._direction == 0:
+            if self._count == 1:
+                self._peak, self._peak_index = cents, k
+            elif abs(cents - self._peak) >= _VIBRATO_HYSTERESIS_CENTS:
+                self._direction = 1 if cents > self._peak else -1
+                self._peak, self._peak_index = cents, k
+            return
+
+        if (cents - self._peak) * self._direction > 0:
+            self._peak, self._peak_index = cents, k
+        elif abs(cents - self._peak) >= _VIBRATO_HYSTERESIS_CENTS:
+            # Extremum confirmé, enregistré à sa position s'il est encore dans la fenêtre
+            if self._peak_index > k - self.required_frames:
+                slot = self._peak_index % self.required_frames
+                self._turns[slot] = True
+                self._n_turns += 1
+                if self._last_turn is not None:
+                    swing = abs(self._peak - self._last_turn)
+                    self._swings[slot] = swing
+                    self._n_swings += 1
+                    self._swing_sum += swing
+            self._last_turn = self._peak
+            self._direction = -self._direction
+            self._peak, self._peak_index = cents, k
+
+    def std(self) -> float:
+        return float(np.sqrt(max(self._m2, 0.0) / self._count)) if self._count else 0.0
 
-        # Vérification si tous les échantillons du tampon sont dans la cible
-        is_stable = all(abs(c) <= self.cfg.stable_cents_tolerance for c in self.buffer)
-        return is_stable
+    def drift(self) -> float:
+        """Pente de la régression linéaire des cents, en cents par seconde."""
+        n = self._count
+        if n < 2:
+            return 0.0
+        first = self._index - n
+        sum_x = n * first + n * (n - 1) / 2.0
+        var_x = (n * n - 1) / 12.0 * n  # sum((k - mean_k)²) pour n index consécutifs
+        cov = self._sum_xy - sum_x * self._mean
+        return float(cov / var_x / self.frame_period)
 
+    def stats(self) -> StabilityStats:
+        n = self._count
+        if n == 0:
+            return StabilityStats()
+        duration = n * self.frame_period
+        # Deux extrema par cycle ; un écart crête à crête vaut deux fois la profondeur
+        rate = self._n_turns / (2.0 * duration)
+        depth = self._swing_sum / (2.0 * self._n_swings) if self._n_swings else 0.0
+        return StabilityStats(
+            frames=n,
+            mean_cents=float(self._mean),
+            std_cents=self.std(),
+            max_abs_cents=float(self._abs_max[0][1]),
+            min_cents=float(self._min[0][1]),
+            max_cents=float(self._max[0][1]),
+            drift_cents_per_s=self.drift(),
+            vibrato_rate_hz=float(rate),
+            vibrato_depth_cents=float(depth),
+        )
@@ -0,0 +1,184 @@
+import os
+import re
+import wave
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from .decimator import Decimator, DecimatedHistory
+
+# Bande de fréquences des profils spectraux, et fréquence d'échantillonnage visée (flux décimé)
+TEMPLATE_FMIN = 60.0
+TEMPLATE_FMAX = 5000.0
+_ANALYSIS_RATE = 11025
+# Version du format des profils : à incrémenter si leur calcul change (invalide le cache)
+_CACHE_VERSION = 1
+# Nom des samples du Studio : {corde}_{case}.wav
+_SAMPLE_NAME = re.compile(r"^(\d+)_(\d+)\.wav$")
+
+
+class TemplateMatcher:
+    """
+    Reconnaissance des positions (corde, case) à partir des samples enregistrés par le Studio.
+
+    Chaque WAV `{corde}_{case}.wav` donne un profil spectral : magnitude (fenêtre de Hann, flux
+    décimé) dans la bande utile, moyennée sur la partie tenue de la note et normalisée. Les
+    profils sont mis en cache sur disque (`templates.npz` dans le dossier des samples), chacun
+    invalidé par la date de modification de son WAV. Tous les profils sont (re)calculés d'un
+    coup, à la création et à chaque refresh() (retour en mode jeu) : jamais pendant un morceau.
+
+    En jeu, le profil de la fenêtre courante est comparé aux seules positions attendues, en un
+    produit matrice-vecteur (similarité cosinus). Une position est reconnue si c'est la meilleure
+    des cibles avec une similarité d'au moins `min_score`.
+    """
+
+    def __init__(self, sample_rate: int, samples_dir: str, window_ms: float, min_score: float):
+        self.sample_rate = sample_rate
+        self.samples_dir = samples_dir
+        self.cache_path = os.path.join(samples_dir, "templates.npz")
+        self.min_score = min_score
+        self.history = DecimatedHistory(sample_rate, _ANALYSIS_RATE, TEMPLATE_FMAX, window_ms)
+
+        size = self.history.size
+        freqs = np.arange(size // 2 + 1) * self.history.rate / size
+        self._band = slice(int(np.searchsorted(freqs, TEMPLATE_FMIN)), int(np.searchsorted(freqs, TEMPLATE_FMAX)))
+        self._window = np.hanning(size).astype(np.float32)
+
+        # (corde, case) -> (mtime du WAV, profil)
+        self._templates = {}
+        self._load_cache()
+        self._requested = ()
+        # (positions surveillées, matrice de leurs profils), remplacés ensemble
+        self._active = ((), None)
+        self.refresh()
+
+    def get_targets(self) -> tuple:
+        """Positions surveillées (celles qui ont un gabarit)."""
+        return self._active[0]
+
+    def set_targets(self, positions) -> None:
+        """Positions à surveiller : simple empilement des profils déjà calculés."""
+        targets = tuple(positions)
+        if targets == self._requested:
+            return
+        self._requested = targets
+        self._stack()
+
+    def refresh(self) -> None:
+        """Calcule les profils de tous les samples présents (nouveaux ou modifiés) et les sauvegarde."""
+        positions = set(self._templates)
+        try:
+            for name in os.listdir(self.samples_dir):
+                match = _SAMPLE_NAME.match(name)
+                if match:
+                    positions.add((int(match.group(1)), int(match.group(2))))
+        except OSError:
+            pass
+        self._refresh(sorted(positions))
+        self._stack()
+
+    def _stack(self) -> None:
+        targets = tuple(p for p in self._requested if p in self._templates)
+        matrix = np.stack([self._templates[p][1] for p in targets]) if targets else None
+        self._active = (targets, matrix)
+
+    def push(self, samples: np.ndarray) -> None:
+        """Ajoute un bloc à l'historique, sans analyse (silence)."""
+        self.history.push(samples)
+
+    def process(self, samples: np.ndarray) -> tuple:
+        """Ajoute un bloc et retourne les positions cibles reconnues (au plus une)."""
+        self.history.push(samples)
+        targets, matrix = self._active
+        if matrix is None:
+            return ()
+        scores = matrix @ self._profiles(self.history.data[None, :])[0]
+        best = int(np.argmax(scores))
+        return (targets[best],) if scores[best] >= self.min_score else ()
+
+    def _profiles(self, frames: np.ndarray) -> np.ndarray:
+        """Profils spectraux normalisés de fenêtres (n, size) du flux décimé."""
+        magnitude = np.abs(np.fft.rfft(frames * self._window, axis=1))[:, self._band]
+        norm = np.linalg.norm(magnitude, axis=1, keepdims=True)
+        return np.divide(magnitude, norm, out=np.zeros_like(magnitude), where=norm > 0)
+
+    # --- Construction des profils et cache ---
+
+    def _sample_path(self, position) -> str:
+        return os.path.join(self.samples_dir, f"{position[0]}_{position[1]}.wav")
+
+    def _refresh(self, positions) -> None:
+        templates = dict(self._templates)
+        changed = False
+        for position in positions:
+            path = self._sample_path(position)
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                changed |= templates.pop(position, None) is not None
+                continue
+            cached = templates.get(position)
+            if cached is not None and cached[0] == mtime:
+                continue
+            template = self._build_template(path)
+            if template is None:
+                changed |= templates.pop(position, None) is not None
+            else:
+                templates[position] = (mtime, template)
+                changed = True
+        # Remplacement d'un bloc : le thread d'analyse ne voit jamais un dictionnaire à moitié à jour
+        self._templates = templates
+        if changed:
+            self._save_cache()
+
+    def _build_template(self, path: str) -> np.ndarray | None:
+        """Profil moyen de la partie tenue (fenêtres au-dessus de 10 % du RMS max) du sample."""
+        try:
+            with wave.open(path, "rb") as wf:
+                rate = wf.getframerate()
+                if wf.getsampwidth() != 2 or wf.getnchannels() != 1:
+                    return None
+                audio = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        except (OSError, EOFError, wave.Error):
+            return None
+        if rate != self.sample_rate:
+            print(f"[ANALYSIS] Sample ignoré (enregistré à {rate}Hz) : {path}")
+            return None
+
+        decimator = Decimator(self.history.decimator.factor)
+        signal = decimator.process(audio.astype(np.float32) / 32768.0)
+        size = self.history.size
+        if len(signal) < size:
+            return None
+        frames = sliding_window_view(signal, size)[::size // 4]
+        rms = np.sqrt(np.mean(frames**2, axis=1))
+        profile = np.mean(self._profiles(frames[rms > 0.1 * np.max(rms)]), axis=0)
+        norm = np.linalg.norm(profile)
+        return (profile / norm).astype(np.float32) if norm > 0 else None
+
+    def _cache_params(self) -> np.ndarray:
+        return np.array([_CACHE_VERSION, self.sample_rate, self.history.rate, self.history.size,
+                         TEMPLATE_FMIN, TEMPLATE_FMAX])
+
+    def _load_cache(self) -> None:
+        try:
+            with np.load(self.cache_path) as data:
+                if not np.array_equal(data["params"], self._cache_params()):
+                    return
+                for position, mtime, template in zip(data["positions"], data["mtimes"], data["templates"]):
+                    self._templates[(int(position[0]), int(position[1]))] = (float(mtime), template)
+        except (OSError, KeyError, ValueError):
+            self._templates = {}
+
+    def _save_cache(self) -> None:
+        positions = list(self._templates)
+        n_bins = self._band.stop - self._band.start
+        tmp_path = self.cache_path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.savez(f, params=self._cache_params(),
+                         positions=np.array(positions, dtype=np.int64).reshape(-1, 2),
+                         mtimes=np.array([self._templates[p][0] for p in positions], dtype=np.float64),
+                         templates=np.array([self._templates[p][1] for p in positions],
+                                            dtype=np.float32).reshape(-1, n_bins))
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"[ANALYSIS] Cache des profils non sauvegardé : {e}")
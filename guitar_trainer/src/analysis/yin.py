@@ -0,0 +1,124 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def yin_difference(frames: np.ndarray) -> np.ndarray:
+    """
+    Fonction de différence YIN de chaque ligne de `frames` (F, N), pour les délais 0..N/2-1,
+    sur une fenêtre d'intégration de N/2 échantillons (mêmes conventions qu'Aubio) :
+        d(tau) = sum_j (x[j] - x[j + tau])² = E(0) + E(tau) - 2 r(tau)
+    L'autocorrélation r est calculée par FFT, pour toutes les trames en une fois.
+    """
+    n_frames, n = frames.shape
+    w = n // 2
+    x = frames.astype(np.float64, copy=False)
+    n_fft = 1 << (n - 1).bit_length()
+
+    spectrum = np.fft.rfft(x, n_fft, axis=1)
+    head = np.fft.rfft(x[:, :w], n_fft, axis=1)
+    r = np.fft.irfft(np.conj(head) * spectrum, n_fft, axis=1)[:, :w]
+
+    energy = np.zeros((n_frames, n + 1))
+    np.cumsum(x**2, axis=1, out=energy[:, 1:])
+    e0 = energy[:, w:w + 1]
+    e_tau = energy[:, w:2 * w] - energy[:, :w]
+    return np.maximum(e0 + e_tau - 2.0 * r, 0.0)
+
+
+def cumulative_mean_normalized(d: np.ndarray) -> np.ndarray:
+    """Différence normalisée par sa moyenne cumulée (d'(0) = 1)."""
+    out = np.ones_like(d)
+    cumulative = np.cumsum(d[:, 1:], axis=1)
+    tau = np.arange(1, d.shape[1])
+    np.divide(d[:, 1:] * tau, cumulative, out=out[:, 1:], where=cumulative > 0)
+    return out
+
+
+def yin_pitch(frames: np.ndarray, sample_rate: float, threshold: float = 0.2,
+              fmin: float = 40.0, fmax: float = 2000.0) -> tuple[np.ndarray, np.ndarray]:
+    """
+    YIN vectorisé sur un lot de trames (F, N). Retourne (f0 en Hz, confiance) pour chaque trame.
+
+    Pour chaque trame : premier délai dont la différence normalisée passe sous `threshold`,
+    suivi jusqu'à son minimum local (à défaut : minimum global), puis interpolation parabolique.
+    La confiance vaut 1 - d'(tau). Une trame nulle renvoie f0 = 0.
+    """
+    frames = np.atleast_2d(frames)
+    n_frames = len(frames)
+    dn = cumulative_mean_normalized(yin_difference(frames))
+    n_lags = dn.shape[1]
+
+    tau_min = max(2, int(sample_rate / fmax))
+    tau_max = min(n_lags - 2, int(np.ceil(sample_rate / fmin)))
+    if tau_max <= tau_min:
+        return np.zeros(n_frames), np.zeros(n_frames)
+
+    seg = dn[:, tau_min:tau_max + 1]
+    below = seg < threshold
+    first = np.argmax(below, axis=1)
+
+    # Descente depuis le premier passage sous le seuil jusqu'au minimum local
+    rising = np.ones_like(below)
+    rising[:, :-1] = seg[:, 1:] >= seg[:, :-1]
+    after = np.arange(seg.shape[1])[None, :] >= first[:, None]
+    local_min = np.argmax(rising & after, axis=1)
+    best = np.where(below.any(axis=1), local_min, np.argmin(seg, axis=1)) + tau_min
+
+    rows = np.arange(n_frames)
+    a, b, c = dn[rows, best - 1], dn[rows, best], dn[rows, best + 1]
+    den = a - 2.0 * b + c
+    shift = np.divide(0.5 * (a - c), den, out=np.zeros(n_frames), where=np.abs(den) > 1e-12)
+    tau = best + np.clip(shift, -1.0, 1.0)
+
+    f0 = sample_rate / tau
+    confidence = np.clip(1.0 - b, 0.0, 1.0)
+    silent = ~np.any(frames, axis=1)
+    f0[silent] = 0.0
+    confidence[silent] = 0.0
+    return f0, confidence
+
+
+def track_pitch(signal: np.ndarray, sample_rate: float, window_size: int, hop_size: int,
+                threshold: float = 0.2, fmin: float = 40.0, fmax: float = 2000.0,
+                chunk_frames: int = 4096) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Analyse hors ligne d'un enregistrement : (temps de fin de trame en s, f0, confiance).
+    Les trames sont des vues glissantes sur le signal, traitées par lots de `chunk_frames`.
+    """
+    if len(signal) < window_size:
+        return np.zeros(0), np.zeros(0), np.zeros(0)
+    frames = sliding_window_view(signal, window_size)[::hop_size]
+    f0 = np.empty(len(frames))
+    confidence = np.empty(len(frames))
+    for start in range(0, len(frames), chunk_frames):
+        stop = start + chunk_frames
+        f0[start:stop], confidence[start:stop] = yin_pitch(frames[start:stop], sample_rate, threshold, fmin, fmax)
+    times = (np.arange(len(frames)) * hop_size + window_size) / sample_rate
+    return times, f0, confidence
+
+
+class YinDetector:
+    """
+    Détecteur YIN NumPy avec la même interface qu'un objet aubio.pitch :
+    appel sur une fenêtre -> tableau [f0], puis get_confidence().
+    batch() analyse un lot de fenêtres (F, N) en un seul passage vectorisé.
+    """
+
+    def __init__(self, sample_rate: float, tolerance: float, fmin: float, fmax: float):
+        self.sample_rate = sample_rate
+        self.tolerance = tolerance
+        self.fmin = fmin
+        self.fmax = fmax
+        self._confidence = 0.0
+
+    def __call__(self, window: np.ndarray) -> np.ndarray:
+        f0, confidence = yin_pitch(window[None, :], self.sample_rate, self.tolerance, self.fmin, self.fmax)
+        self._confidence = float(confidence[0])
+        return f0
+
+    def batch(self, frames: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """(f0, confiance) de chaque fenêtre du lot."""
+        return yin_pitch(frames, self.sample_rate, self.tolerance, self.fmin, self.fmax)
+
+    def get_confidence(self) -> float:
+        return self._confidence
@@ -0,0 +1,211 @@
+"""
+Micro-benchmark de la chaîne d'effets.
+
+Usage (depuis guitar_trainer/) :
+    python -m src.audio.bench [--sample-rate 44100] [--block-size 1024]
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+import numpy as np
+from types import SimpleNamespace
+
+from .processor import AudioProcessor, SoftGate, ToneFilter, SimpleReverb
+
+# Rapport entre les deux tailles de bloc de la mesure d'allocations
+_ALLOC_SCALE = 8
+
+
+def _make_blocks(sample_rate: int, block_size: int, count: int) -> list[np.ndarray]:
+    """Signal de test : une note qui s'éteint puis reprend (le gate s'ouvre et se ferme)."""
+    rng = np.random.default_rng(0)
+    t = np.arange(block_size * count) / sample_rate
+    signal = 0.3 * np.sin(2 * np.pi * 110.0 * t) * (np.sin(2 * np.pi * 0.5 * t) > 0)
+    signal += 0.001 * rng.standard_normal(len(t))
+    signal = signal.astype(np.float32)
+    return [signal[i * block_size:(i + 1) * block_size] for i in range(count)]
+
+
+def _time_per_sample(fn, blocks: list[np.ndarray], repeat: int = 3) -> float:
+    """Retourne le meilleur temps par échantillon (en ns) sur plusieurs passes."""
+    best = float("inf")
+    n_samples = sum(len(b) for b in blocks)
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for block in blocks:
+            fn(block)
+        best = min(best, time.perf_counter() - start)
+    return best / n_samples * 1e9
+
+
+def _report(name: str, ref_ns: float, fast_ns: float, max_err: float) -> None:
+    print(f"{name:<12} loop: {ref_ns:9.1f} ns/sample | vectorized: {fast_ns:7.2f} ns/sample "
+          f"| x{ref_ns / fast_ns:6.1f} | max err: {max_err:.2e}")
+
+
+def bench_gate(sample_rate: int, block_size: int, count: int) -> None:
+    blocks = _make_blocks(sample_rate, block_size, count)
+
+    ref, fast = SoftGate(sample_rate), SoftGate(sample_rate)
+    ref.set_threshold(0.5)
+    fast.set_threshold(0.5)
+    max_err = max(float(np.max(np.abs(ref._process_scalar(b) - fast.process(b)))) for b in blocks)
+
+    ref_ns = _time_per_sample(ref._process_scalar, blocks)
+    fast_ns = _time_per_sample(fast.process, blocks)
+    _report("SoftGate", ref_ns, fast_ns, max_err)
+
+
+def bench_tone(sample_rate: int, block_size: int, count: int) -> None:
+    blocks = _make_blocks(sample_rate, block_size, count)
+
+    ref, fast = ToneFilter(sample_rate), ToneFilter(sample_rate)
+    ref.set_tone(0.12)
+    fast.set_tone(0.12)
+    max_err = max(float(np.max(np.abs(ref._process_scalar(b) - fast.process(b)))) for b in blocks)
+
+    ref_ns = _time_per_sample(ref._process_scalar, blocks)
+    fast_ns = _time_per_sample(fast.process, blocks)
+    _report("ToneFilter", ref_ns, fast_ns, max_err)
+
+    biquad = ToneFilter(sample_rate, order=2)
+    biquad.set_tone(0.12)
+    print(f"{'Tone biquad':<12} vectorized: {_time_per_sample(biquad.process, blocks):7.2f} ns/sample")
+
+
+def bench_reverb(sample_rate: int, block_size: int, count: int) -> None:
+    blocks = _make_blocks(sample_rate, block_size, count)
+
+    ref, fast = SimpleReverb(sample_rate), SimpleReverb(sample_rate)
+    max_err = max(float(np.max(np.abs(ref._process_scalar(b) - fast.process(b)))) for b in blocks)
+
+    ref_ns = _time_per_sample(ref._process_scalar, blocks, repeat=1)
+    fast_ns = _time_per_sample(fast.process, blocks)
+    _report("SimpleReverb", ref_ns, fast_ns, max_err)
+
+
+def _allocation_peak(fn, calls: list[tuple]) -> tuple[int, int]:
+    """
+    Pic de mémoire allouée (octets) par appel de `fn`, au pire sur tous les appels, et nombre
+    de passages du ramasse-miettes pendant la mesure.
+    """
+    collections = []
+    def on_gc(phase, info):
+        if phase == "start":
+            collections.append(info["generation"])
+
+    worst_peak = 0
+    gc.callbacks.append(on_gc)
+    tracemalloc.start()
+    try:
+        for args in calls:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            fn(*args)
+            _, peak = tracemalloc.get_traced_memory()
+            worst_peak = max(worst_peak, peak - before)
+    finally:
+        tracemalloc.stop()
+        gc.callbacks.remove(on_gc)
+    return worst_peak, len(collections)
+
+
+def _excess_peak(fn, calls: list[tuple]) -> tuple[int, int]:
+    """
+    Pic par appel au-delà de celui d'une fonction vide appelée avec les mêmes arguments (objets
+    Python transitoires de l'appel lui-même), et nombre de passages du ramasse-miettes.
+    """
+    baseline, _ = _allocation_peak(lambda *args: None, calls)
+    peak, collections = _allocation_peak(fn, calls)
+    return peak - baseline, collections
+
+
+def _check_allocations(name: str, make_calls, sample_rate: int, block_size: int, count: int) -> bool:
+    """
+    Mesure le même callback sur des blocs de block_size puis _ALLOC_SCALE x block_size
+    échantillons. Les vues et scalaires numpy coûtent un pic fixe (environ 1 Kio) qui masquerait
+    un buffer d'un petit bloc ; il s'annule dans l'écart entre les deux tailles, alors qu'un
+    buffer proportionnel au bloc, devenu plus gros que ce pic fixe, fait croître l'écart d'au
+    moins un bloc float32 : la limite.
+    """
+    peak, collections = _excess_peak(*make_calls(sample_rate, block_size, count))
+    peak_large, collections_large = _excess_peak(*make_calls(sample_rate, _ALLOC_SCALE * block_size, count))
+    growth = peak_large - peak
+    limit = block_size * np.dtype(np.float32).itemsize
+    ok = growth < limit and not collections and not collections_large
+    print(f"{name:<12} pic par callback: {peak} octets (x{_ALLOC_SCALE}: {peak_large}, écart {growth}, "
+          f"limite {limit}) | GC déclenchés: {collections + collections_large} -> {'OK' if ok else 'ECHEC'}")
+    return ok
+
+
+def _processor_calls(sample_rate: int, block_size: int, count: int) -> tuple:
+    """Chaîne complète réglée comme en jeu, échauffée, et ses appels de mesure."""
+    blocks = [b.reshape(1, -1) for b in _make_blocks(sample_rate, block_size, count)]
+    processor = AudioProcessor(sample_rate, block_size)
+    processor.set_gate_threshold(0.5)
+    processor.set_drive(0.3)
+    processor.set_tone(0.5)
+    processor.set_volume(0.8)
+    for block in blocks[:10]:
+        processor.process(block)
+    return processor.process, [(b,) for b in blocks]
+
+
+def _callback_calls(sample_rate: int, block_size: int, count: int) -> tuple:
+    """
+    Callback duplex complet (file d'analyse, mixage d'un sample en lecture, chaîne d'effets,
+    recopie stéréo) avec des tableaux indata/outdata simulés, échauffé, et ses appels de mesure.
+    """
+    from .stream import AudioStream
+    from ..core.config import AppConfig
+
+    stream = AudioStream(AppConfig(sample_rate=sample_rate, block_size=block_size))
+    stream.processor = AudioProcessor(sample_rate, block_size)
+    stream.processor.set_drive(0.3)
+    time_info = SimpleNamespace(inputBufferAdcTime=0.0, currentTime=0.0)
+    calls = [(b.reshape(-1, 1), np.zeros((block_size, 2), dtype=np.float32), block_size, time_info, None)
+             for b in _make_blocks(sample_rate, block_size, count)]
+    # Un sample plus long que la mesure : le mixage reste actif sur tous les blocs
+    stream.play_sample(np.zeros(block_size * (count + 20), dtype=np.float32))
+    for args in calls[:10]:
+        stream._callback(*args)
+    return stream._callback, calls
+
+
+def bench_allocations(sample_rate: int, block_size: int, count: int) -> bool:
+    """
+    Vérifie que la chaîne complète ne crée aucun buffer par callback (après échauffement)
+    et ne déclenche pas le ramasse-miettes. Retourne True si le test passe.
+    """
+    return _check_allocations("Allocations", _processor_calls, sample_rate, block_size, count)
+
+
+def bench_callback(sample_rate: int, block_size: int, count: int) -> bool:
+    """Même vérification sur le callback duplex de AudioStream."""
+    try:
+        from . import stream  # noqa: F401  (requiert sounddevice)
+    except ImportError:
+        print(f"{'Callback':<12} sounddevice non installé")
+        return True
+    return _check_allocations("Callback", _callback_calls, sample_rate, block_size, count)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark des effets audio")
+    parser.add_argument("--sample-rate", type=int, default=44100)
+    parser.add_argument("--block-size", type=int, default=1024)
+    parser.add_argument("--blocks", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"[BENCH] {args.blocks} blocs de {args.block_size} @ {args.sample_rate}Hz")
+    bench_gate(args.sample_rate, args.block_size, args.blocks)
+    bench_tone(args.sample_rate, args.block_size, args.blocks)
+    bench_reverb(args.sample_rate, args.block_size, args.blocks)
+    ok = bench_allocations(args.sample_rate, args.block_size, args.blocks)
+    ok = bench_callback(args.sample_rate, args.block_size, args.blocks) and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
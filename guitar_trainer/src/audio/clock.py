@@ -0,0 +1,57 @@
+import time
+
+
+class StreamClock:
+    """
+    Horloge monotone du flux audio, exprimée dans la base de temps de time.perf_counter().
+
+    Elle est ancrée une seule fois, au premier callback, sur l'instant de capture (ADC) du
+    premier échantillon fourni par PortAudio (`time_info.inputBufferAdcTime`). Ensuite, le
+    temps d'un échantillon se déduit uniquement du compteur d'échantillons :
+        t(n) = ancre + n / sample_rate
+    Les horodatages ne dépendent donc plus de l'ordonnancement du callback (pas de gigue)
+    et compensent la latence d'entrée.
+    """
+
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+        self._anchor = None  # temps perf_counter de l'échantillon 0
+
+    def reset(self, sample_rate: int | None = None) -> None:
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        self._anchor = None
+
+    def is_anchored(self) -> bool:
+        return self._anchor is not None
+
+    def on_callback(self, time_info, sample_index: int) -> float:
+        """Appelée par le callback audio : retourne le temps du premier échantillon du bloc."""
+        if self._anchor is None:
+            self._anchor = time.perf_counter() - self._input_latency(time_info) - sample_index / self.sample_rate
+        return self._anchor + sample_index / self.sample_rate
+
+    def time_of(self, sample_index: float) -> float:
+        """Temps (base perf_counter) d'un index d'échantillon du flux."""
+        if self._anchor is None:
+            return time.perf_counter()
+        return self._anchor + sample_index / self.sample_rate
+
+    def sample_at(self, t: float) -> float:
+        """Index d'échantillon (fractionnaire) correspondant à un temps perf_counter."""
+        if self._anchor is None:
+            return 0.0
+        return (t - self._anchor) * self.sample_rate
+
+    @staticmethod
+    def _input_latency(time_info) -> float:
+        """
+        Délai entre la capture du premier échantillon et l'appel du callback, en secondes.
+        Certains hôtes renvoient 0 pour inputBufferAdcTime : on se rabat alors sur currentTime
+        (aucune compensation).
+        """
+        adc = getattr(time_info, "inputBufferAdcTime", 0.0) or 0.0
+        current = getattr(time_info, "currentTime", 0.0) or 0.0
+        if adc <= 0.0 or current < adc:
+            return 0.0
+        return current - adc
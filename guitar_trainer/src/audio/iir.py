@@ -0,0 +1,198 @@
+import numpy as np
+
+# Borne de dynamique des puissances p^-k utilisées dans la forme close
+# (évite les overflow float64 pour les pôles proches de 0).
+_MAX_DYNAMIC_LOG = np.log(1e150)
+
+
+class BlockIIR:
+    """
+    Filtre IIR (ordre 1 ou 2 / biquad) appliqué par blocs, sans boucle Python par échantillon.
+
+    Le filtre est décomposé en sections parallèles à un pôle (fractions partielles) :
+        H(z) = k + sum_i r_i / (1 - p_i z^-1)
+    Chaque section est calculée en forme close sur des sous-blocs avec un cumsum :
+        s[j] = p^j * (p * s[-1] + r * cumsum(x[k] * p^-k)[j])
+
+    L'état persistant entre blocs est l'historique "forme directe I" (dernières entrées et
+    sorties). Il est indépendant des coefficients : on peut donc changer la fréquence de coupure
+    entre deux blocs sans discontinuité, les états des sections étant recalculés à partir de
+    cet historique.
+    """
+
+    def __init__(self, b, a, block_size=1024):
+        # Historique en scalaires Python (ordre <= 2) : pas de petits tableaux numpy par bloc
+        self._x_hist = []  # x[-1], x[-2], ... (le plus récent en premier)
+        self._y_hist = []
+        self.order = 0
+        self._x = np.zeros(block_size, dtype=np.float64)
+        self._y = np.zeros(block_size, dtype=np.float64)
+        self._work = None
+        self.set_coefficients(b, a)
+
+    def set_coefficients(self, b, a) -> None:
+        a = np.asarray(a, dtype=np.float64)
+        b = np.asarray(b, dtype=np.float64)
+        if a.ndim != 1 or len(a) < 2 or a[0] == 0.0:
+            raise ValueError("Denominator must be at least first order with a[0] != 0")
+        b = b / a[0]
+        a = a / a[0]
+        order = len(a) - 1
+        if len(b) > order + 1:
+            raise ValueError("Numerator order must not exceed denominator order")
+        if a[-1] == 0.0:
+            raise ValueError("Highest denominator coefficient must be non-zero")
+        b = np.concatenate([b, np.zeros(order + 1 - len(b))])
+
+        # Pôles : racines de z^N + a1 z^(N-1) + ... + aN
+        poles = np.roots(a).astype(np.complex128)
+        if np.any(np.abs(poles) >= 1.0):
+            raise ValueError("Unstable filter (pole outside the unit circle)")
+        if order > 1 and np.min(np.abs(np.subtract.outer(poles, poles)) + np.eye(order)) < 1e-9:
+            raise ValueError("Repeated poles are not supported")
+
+        # Terme direct et résidus (polynômes en w = z^-1)
+        k = b[-1] / a[-1]
+        num = (b - k * a)[::-1]  # coefficients de B(w) - k A(w) pour np.polyval
+        residues = np.empty(order, dtype=np.complex128)
+        for i, p in enumerate(poles):
+            w = 1.0 / p
+            others = np.prod([1.0 - q * w for j, q in enumerate(poles) if j != i])
+            residues[i] = np.polyval(num, w) / others
+
+        # Pôles réels (cas du passe-bas à un pôle) : on reste en arithmétique réelle
+        if np.all(poles.imag == 0.0):
+            poles = poles.real.copy()
+            residues = residues.real.copy()
+
+        # Conversion historique DF1 -> états des sections : M @ s[-1] = rhs
+        inv = 1.0 / poles
+        m_idx = np.arange(order)[:, None]
+        self._state_matrix_inv = np.linalg.inv(inv[None, :] ** m_idx).tolist()
+
+        if order != self.order:
+            self._x_hist = [0.0] * order
+            self._y_hist = [0.0] * order
+        self.order = order
+        self._k = float(k)
+        self._poles = poles
+        self._residues = residues
+        self._inv_poles = inv
+        self._sections = list(zip(poles.tolist(), residues.tolist(), inv.tolist()))
+        self._chunk = self._max_chunk(poles)
+        self._pow_cache = {}
+        self._view_cache = {}
+        if self._work is None or self._work.dtype != poles.dtype:
+            self._work = np.zeros(len(self._x), dtype=poles.dtype)
+
+    def reset(self) -> None:
+        self._x_hist = [0.0] * self.order
+        self._y_hist = [0.0] * self.order
+
+    @staticmethod
+    def _max_chunk(poles) -> int:
+        decay = -np.log(np.max(np.abs(poles)))
+        if decay <= 0.0:
+            return 1 << 30
+        return max(1, int(_MAX_DYNAMIC_LOG / decay))
+
+    def _get_powers(self, length: int):
+        """Puissances p^j et p^-j pour chaque section, mises en cache par longueur de sous-bloc."""
+        powers = self._pow_cache.get(length)
+        if powers is None:
+            j = np.arange(length)
+            pos = self._poles[:, None] ** j[None, :]
+            neg = self._inv_poles[:, None] ** j[None, :]
+            powers = (pos, neg)
+            self._pow_cache[length] = powers
+        return powers
+
+    def _initial_states(self) -> list:
+        """États s_i[-1] des sections, déduits de l'historique entrées/sorties."""
+        order = self.order
+        rhs = [self._y_hist[m] - self._k * self._x_hist[m] for m in range(order)]
+        for m in range(1, order):
+            for l in range(m):
+                for _, r, inv in self._sections:
+                    rhs[m] += r * self._x_hist[l] * inv ** (m - l)
+        states = []
+        for row in self._state_matrix_inv:
+            state = 0.0
+            for m in range(order):
+                state += row[m] * rhs[m]
+            states.append(state)
+        return states
+
+    def _get_views(self, n: int) -> tuple:
+        """
+        Vues sur les buffers de travail pour des blocs de n échantillons (par sous-bloc et par
+        section), mises en cache par longueur : un bloc ne crée aucun objet numpy, pas même une vue.
+        """
+        views = self._view_cache.get(n)
+        if views is None:
+            if len(self._x) < n:
+                self._x = np.zeros(n, dtype=np.float64)
+                self._y = np.zeros(n, dtype=np.float64)
+                self._work = np.zeros(n, dtype=self._poles.dtype)
+            pos, neg = self._get_powers(min(self._chunk, n))
+            chunks = []
+            for start in range(0, n, self._chunk):
+                m = min(self._chunk, n - start)
+                acc = self._work[:m]
+                sections = [(neg[s, :m], pos[s, :m]) for s in range(self.order)]
+                chunks.append((self._x[start:start + m], self._y[start:start + m], acc, acc.real, sections))
+            if len(self._view_cache) > 8:
+                self._view_cache.clear()
+            views = (self._x[:n], self._y[:n], chunks)
+            self._view_cache[n] = views
+        return views
+
+    def process(self, samples: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+        n = len(samples)
+        if out is None:
+            out = np.empty_like(samples)
+        if n == 0:
+            return out
+
+        x, y, chunks = self._get_views(n)
+        np.copyto(x, samples)
+        np.multiply(x, self._k, out=y)
+        states = self._initial_states()
+
+        for xs, ys, acc, acc_real, sections in chunks:
+            for s, (p, r, _) in enumerate(self._sections):
+                neg, pos = sections[s]
+                np.multiply(xs, neg, out=acc)
+                # add.accumulate et non cumsum : le wrapper de np.cumsum alloue à chaque appel
+                np.add.accumulate(acc, out=acc)
+                acc *= r
+                acc += p * states[s]
+                acc *= pos
+                ys += acc_real
+                states[s] = acc[-1]
+
+        self._push_history(x, y)
+        np.copyto(out, y, casting="same_kind")
+        return out
+
+    def _push_history(self, x: np.ndarray, y: np.ndarray) -> None:
+        order = self.order
+        n = len(x)
+        take = min(order, n)
+        self._x_hist = [float(x[n - 1 - k]) for k in range(take)] + self._x_hist[:order - take]
+        self._y_hist = [float(y[n - 1 - k]) for k in range(take)] + self._y_hist[:order - take]
+
+
+def one_pole_lowpass(alpha: float) -> tuple[list[float], list[float]]:
+    """Coefficients (b, a) du passe-bas y[n] = y[n-1] + alpha * (x[n] - y[n-1])."""
+    return [alpha], [1.0, -(1.0 - alpha)]
+
+
+def biquad_lowpass(freq_hz: float, sample_rate: float, q: float = 0.7071) -> tuple[list[float], list[float]]:
+    """Coefficients (b, a) d'un passe-bas biquad (RBJ Audio EQ Cookbook)."""
+    w0 = 2.0 * np.pi * freq_hz / sample_rate
+    alpha = np.sin(w0) / (2.0 * q)
+    cos_w0 = np.cos(w0)
+    b = [(1.0 - cos_w0) / 2.0, 1.0 - cos_w0, (1.0 - cos_w0) / 2.0]
+    a = [1.0 + alpha, -2.0 * cos_w0, 1.0 - alpha]
+    return b, a
@@ -1,17 +1,74 @@
 import numpy as np
+from .iir import BlockIIR, one_pole_lowpass, biquad_lowpass
+
+
+def _scratch(buf, n, dtype=np.float32):
+    """Retourne une vue de n éléments sur un buffer de travail (réalloué seulement s'il est trop petit)."""
+    if buf is None or len(buf) < n:
+        buf = np.zeros(max(n, 1), dtype=dtype)
+    return buf
+
+
+def _passthrough(samples, out):
+    if out is None or out is samples:
+        return samples
+    np.copyto(out, samples)
+    return out
+
 
 class SoftGate:
-    def __init__(self, sample_rate):
+    def __init__(self, sample_rate, block_size=1024):
         self.sample_rate = sample_rate
         self.threshold = 0.0
         self._envelope = 1.0
         self._attack_coeff = 1.0 - np.exp(-1.0 / (0.005 * sample_rate))
         self._release_coeff = 1.0 - np.exp(-1.0 / (0.05 * sample_rate))
+        # Cache des puissances (1 - coeff)^(i+1), indexé par (coeff, taille de bloc)
+        self._decay_cache = {}
+        self._get_decay(self._attack_coeff, block_size)
+        self._get_decay(self._release_coeff, block_size)
+        self._env = np.zeros(block_size, dtype=np.float64)
+        self._gain = np.zeros(block_size, dtype=np.float32)
 
     def set_threshold(self, value):
         self.threshold = value * 0.1
 
-    def process(self, samples):
+    def process(self, samples, out=None):
+        n = len(samples)
+        if self.threshold <= 0.0 or n == 0:
+            return _passthrough(samples, out)
+        if out is None:
+            out = np.empty_like(samples)
+        rms = np.sqrt(np.dot(samples, samples) / n)
+        target = 1.0 if rms > self.threshold else 0.0
+        coeff = self._attack_coeff if target > self._envelope else self._release_coeff
+
+        # Forme close de l'enveloppe à un pôle sur tout le bloc :
+        # env[i] = target + (env0 - target) * (1 - coeff)^(i+1)
+        decay = self._get_decay(coeff, n)
+        self._env = _scratch(self._env, n, np.float64)
+        self._gain = _scratch(self._gain, n)
+        env = self._env[:n]
+        np.multiply(decay, self._envelope - target, out=env)
+        env += target
+        self._envelope = float(env[-1])
+        # Gain en float32 (comme la boucle d'origine) : pas de buffer de conversion dans le ufunc
+        gain = self._gain[:n]
+        np.copyto(gain, env, casting="same_kind")
+        return np.multiply(samples, gain, out=out)
+
+    def _get_decay(self, coeff, n):
+        key = (coeff, n)
+        decay = self._decay_cache.get(key)
+        if decay is None:
+            if len(self._decay_cache) > 8:
+                self._decay_cache.clear()
+            decay = np.power(1.0 - coeff, np.arange(1, n + 1, dtype=np.float64))
+            self._decay_cache[key] = decay
+        return decay
+
+    def _process_scalar(self, samples):
+        """Implémentation de référence échantillon par échantillon (benchmarks)."""
         if self.threshold <= 0.0:
             return samples
         rms = np.sqrt(np.mean(samples ** 2))
@@ -29,21 +86,29 @@ class SoftGate:
 class Distortion:
     def __init__(self):
         self.drive = 1.0
+        self._makeup = 1.0
 
     def set_drive(self, value):
         self.drive = 1.0 + value * 20.0
+        self._makeup = float(1.0 / np.tanh(self.drive))
 
-    def process(self, samples):
+    def process(self, samples, out=None):
         if self.drive <= 1.01:
-            return samples
-        driven = samples * self.drive
-        return np.tanh(driven) * (1.0 / np.tanh(self.drive))
+            return _passthrough(samples, out)
+        out = np.multiply(samples, self.drive, out=out)
+        np.tanh(out, out=out)
+        out *= self._makeup
+        return out
 
 
 class ToneFilter:
-    def __init__(self, sample_rate):
+    def __init__(self, sample_rate, order=1, block_size=1024):
+        # order=1 : passe-bas à un pôle (historique), order=2 : biquad Butterworth
         self.sample_rate = sample_rate
+        self.order = order
+        self.block_size = block_size
         self._prev = 0.0
+        self._iir = None
         self.set_cutoff(10000.0)
 
     def set_cutoff(self, freq_hz):
@@ -51,12 +116,27 @@ class ToneFilter:
         rc = 1.0 / (2.0 * np.pi * freq_hz)
         dt = 1.0 / self.sample_rate
         self._alpha = dt / (rc + dt)
+        self.cutoff_hz = freq_hz
+
+        if self.order == 2:
+            b, a = biquad_lowpass(freq_hz, self.sample_rate)
+        else:
+            b, a = one_pole_lowpass(self._alpha)
+        # L'état du filtre (historique entrées/sorties) est conservé : pas de clic
+        if self._iir is None:
+            self._iir = BlockIIR(b, a, block_size=self.block_size)
+        else:
+            self._iir.set_coefficients(b, a)
 
     def set_tone(self, value):
         cutoff = 400.0 + (value * 11600.0)
         self.set_cutoff(cutoff)
 
-    def process(self, samples):
+    def process(self, samples, out=None):
+        return self._iir.process(samples, out=out)
+
+    def _process_scalar(self, samples):
+        """Implémentation de référence échantillon par échantillon (benchmarks, ordre 1)."""
         out = np.empty_like(samples)
         prev = self._prev
         alpha = self._alpha
@@ -68,7 +148,7 @@ class ToneFilter:
 
 
 class SimpleReverb:
-    def __init__(self, sample_rate):
+    def __init__(self, sample_rate, block_size=1024):
         self.sample_rate = sample_rate
         self.wet = 0.2
         self.room_size = 0.5
@@ -92,7 +172,76 @@ class SimpleReverb:
             self._ap_buffers.append(np.zeros(size, dtype=np.float32))
             self._ap_indices.append(0)
 
-    def process(self, samples):
+        self._wet_buffer = np.zeros(block_size, dtype=np.float32)
+        self._delayed_buffer = np.zeros(block_size, dtype=np.float32)
+
+    def process(self, samples, out=None):
+        if self.wet <= 0.01:
+            return _passthrough(samples, out)
+
+        n = len(samples)
+        self._wet_buffer = _scratch(self._wet_buffer, n)
+        self._delayed_buffer = _scratch(self._delayed_buffer, n)
+        wet_signal = self._wet_buffer[:n]
+        wet_signal.fill(0.0)
+
+        # Peignes : le retard (29.7-43.7 ms) dépasse la taille du bloc, donc un segment
+        # contigu du buffer circulaire ne relit jamais ce qu'il vient d'écrire.
+        for c in range(len(self._comb_buffers)):
+            buf = self._comb_buffers[c]
+            fb = self._comb_feedbacks[c]
+            i, j = 0, self._comb_indices[c]
+            while i < n:
+                m = _delay_chunk(i, j, len(buf), n)
+                if m == 1:
+                    # Segment d'un échantillon (fin du buffer circulaire) : en scalaire, un ufunc
+                    # sur un tableau de taille 1 alloue son itérateur à chaque appel
+                    delayed = float(buf[j])
+                    wet_signal[i] += delayed
+                    buf[j] = samples[i] + delayed * fb
+                else:
+                    delayed = buf[j:j + m]
+                    wet_signal[i:i + m] += delayed
+                    delayed *= fb
+                    delayed += samples[i:i + m]
+                i, j = i + m, (j + m) % len(buf)
+            self._comb_indices[c] = j
+
+        wet_signal *= (1.0 / len(self._comb_buffers))
+
+        # Passe-tout : même principe, découpé en sous-blocs si le retard est court (1.7 ms)
+        g = self._ap_gain
+        for a in range(len(self._ap_buffers)):
+            buf = self._ap_buffers[a]
+            i, j = 0, self._ap_indices[a]
+            while i < n:
+                m = _delay_chunk(i, j, len(buf), n)
+                if m == 1:
+                    delayed = float(buf[j])
+                    inp = float(wet_signal[i])
+                    buf[j] = inp + delayed * g
+                    wet_signal[i] = delayed - inp * g
+                else:
+                    segment = buf[j:j + m]
+                    delayed = self._delayed_buffer[:m]
+                    np.copyto(delayed, segment)
+                    inp = wet_signal[i:i + m]
+                    # buf = inp + delayed * g
+                    segment *= g
+                    segment += inp
+                    # sortie = delayed - inp * g
+                    inp *= g
+                    np.subtract(delayed, inp, out=inp)
+                i, j = i + m, (j + m) % len(buf)
+            self._ap_indices[a] = j
+
+        out = np.multiply(samples, 1.0 - self.wet, out=out)
+        wet_signal *= self.wet
+        out += wet_signal
+        return out
+
+    def _process_scalar(self, samples):
+        """Implémentation de référence échantillon par échantillon (benchmarks)."""
         if self.wet <= 0.01:
             return samples
 
@@ -129,28 +278,52 @@ class SimpleReverb:
         return samples * (1.0 - self.wet) + wet_signal * self.wet
 
 
+def _delay_chunk(i, idx, buf_len, n):
+    """
+    Longueur du segment traitable d'un seul coup sur une ligne à retard circulaire, à partir de
+    la position i dans le bloc (n échantillons) et idx dans le buffer (buf_len échantillons).
+    Un segment ne franchit jamais la fin du buffer et ne dépasse pas buf_len échantillons,
+    donc chaque case lue n'a pas encore été réécrite dans ce segment. Les segments sont
+    parcourus par une boucle while plutôt qu'une liste ou un générateur, alloués à chaque bloc.
+    """
+    return min(n - i, buf_len - idx)
+
+
 class AudioProcessor:
     def __init__(self, sample_rate: int, block_size: int):
         self.sample_rate = sample_rate
         self.block_size = block_size
 
-        self.gate = SoftGate(sample_rate)
+        self.gate = SoftGate(sample_rate, block_size)
         self.distortion = Distortion()
-        self.tone = ToneFilter(sample_rate)
-        self.reverb = SimpleReverb(sample_rate)
+        self.tone = ToneFilter(sample_rate, block_size=block_size)
+        self.reverb = SimpleReverb(sample_rate, block_size)
         self.gain_db = 0.0
         self._gain_linear = 1.0
 
-    def process(self, input_audio: np.ndarray) -> np.ndarray:
-        mono = input_audio[0] if input_audio.ndim == 2 else input_audio
-
-        out = self.gate.process(mono)
-        out = self.distortion.process(out)
-        out = self.tone.process(out)
-        out = self.reverb.process(out)
-        out = out * self._gain_linear
+        # Buffer de sortie réutilisé à chaque callback : aucune allocation dans la chaîne
+        self._buffer = np.zeros(block_size, dtype=np.float32)
 
-        out = np.clip(out, -1.0, 1.0)
+    def process(self, input_audio: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+        """
+        Applique la chaîne d'effets. Chaque étage écrit dans le même buffer préalloué
+        (ou dans `out` s'il est fourni). Le résultat est donc écrasé au bloc suivant :
+        l'appelant doit le consommer (copie vers la sortie audio) avant le prochain appel.
+        """
+        mono = input_audio[0] if input_audio.ndim == 2 else input_audio
+        n = len(mono)
+        if out is None:
+            self._buffer = _scratch(self._buffer, n)
+            out = self._buffer[:n]
+
+        self.gate.process(mono, out=out)
+        self.distortion.process(out, out=out)
+        self.tone.process(out, out=out)
+        self.reverb.process(out, out=out)
+        out *= self._gain_linear
+        # Écrêtage en deux ufuncs : np.clip passe par un wrapper Python qui alloue à chaque bloc
+        np.minimum(out, 1.0, out=out)
+        np.maximum(out, -1.0, out=out)
 
         if input_audio.ndim == 2:
             return out.reshape(1, -1)
@@ -169,5 +342,6 @@ class AudioProcessor:
         if value <= 0.01:
             self.gain_db = -100.0
         else:
-            self.gain_db = 20 * np.log10(value)
+            self.gain_db = 20 * float(np.log10(value))
+        # Scalaire Python (et non np.float64) : évite la promotion float64 du buffer float32
         self._gain_linear = 10 ** (self.gain_db / 20.0)
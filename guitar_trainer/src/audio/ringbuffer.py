@@ -0,0 +1,162 @@
+import time
+import numpy as np
+from ..core.types import AudioBlock
+
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_DROP_NEWEST = "drop_newest"
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST)
+
+
+class AudioRingBuffer:
+    """
+    File circulaire préallouée, un seul producteur (callback audio) / un seul consommateur.
+
+    Aucun verrou : chaque compteur n'est écrit que par un seul thread. Le producteur réserve
+    le slot (`_claim_count`), le remplit puis publie en incrémentant `_write_count`, le
+    consommateur avance `_read_count`.
+
+    Politique de débordement :
+      - "drop_newest" : si la file est pleine, le bloc entrant est ignoré ;
+      - "drop_oldest" : le producteur écrase le plus ancien bloc, un seul par push en trop :
+        la file garde ses `capacity` derniers blocs. Le consommateur détecte le dépassement en
+        comparant les compteurs, saute les blocs perdus et invalide une copie si le slot a
+        été réservé pour une réécriture pendant sa lecture.
+    """
+
+    def __init__(self, capacity: int, block_size: int, sample_rate: int,
+                 overflow_policy: str = OVERFLOW_DROP_OLDEST):
+        if capacity < 2:
+            raise ValueError("Ring capacity must be at least 2 blocks")
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+        self.capacity = capacity
+        self.block_size = block_size
+        self.sample_rate = sample_rate
+        self.overflow_policy = overflow_policy
+
+        self._frames = np.zeros((capacity, block_size), dtype=np.float32)
+        self._lengths = np.zeros(capacity, dtype=np.int64)
+        self._sample_index = np.zeros(capacity, dtype=np.int64)
+        self._timestamps = np.zeros(capacity, dtype=np.float64)
+
+        self._write_count = 0      # écrit uniquement par le producteur
+        self._claim_count = 0      # producteur : slots réservés (= _write_count hors écriture)
+        self._read_count = 0       # écrit uniquement par le consommateur
+        self._dropped_newest = 0   # producteur
+        self._dropped_oldest = 0   # consommateur
+        self._underflows = 0       # consommateur
+
+    # --- Producteur (callback audio) ---
+
+    def push(self, samples: np.ndarray, sample_index: int, timestamp: float) -> bool:
+        """Copie un bloc dans le slot suivant. Ne bloque jamais, n'alloue pas de buffer."""
+        n = len(samples)
+        w = self._write_count
+        if n > self.block_size:
+            self._dropped_newest += 1
+            return False
+        if self.overflow_policy == OVERFLOW_DROP_NEWEST and w - self._read_count >= self.capacity:
+            self._dropped_newest += 1
+            return False
+
+        slot = w % self.capacity
+        # Réservation avant écriture : le consommateur sait que ce slot est en cours de réécriture
+        self._claim_count = w + 1
+        np.copyto(self._frames[slot, :n], samples)
+        self._lengths[slot] = n
+        self._sample_index[slot] = sample_index
+        self._timestamps[slot] = timestamp
+        self._write_count = w + 1  # publication
+        return True
+
+    # --- Consommateur ---
+
+    def available(self) -> int:
+        return min(self._write_count - self._read_count, self.capacity)
+
+    def pop(self) -> AudioBlock | None:
+        """Retourne le plus ancien bloc disponible (copie), ou None si la file est vide."""
+        while True:
+            r = self._read_count
+            w = self._write_count
+            if r >= w:
+                self._underflows += 1
+                return None
+
+            # Le producteur a pu écraser des blocs (drop_oldest) : seuls les `capacity` derniers
+            # publiés sont encore dans la file, on saute les autres.
+            overwrite = self.overflow_policy == OVERFLOW_DROP_OLDEST
+            if overwrite and w - r > self.capacity:
+                skipped = w - r - self.capacity
+                self._dropped_oldest += skipped
+                r += skipped
+
+            slot = r % self.capacity
+            n = int(self._lengths[slot])
+            samples = self._frames[slot, :n].copy()
+            sample_index = int(self._sample_index[slot])
+            timestamp = float(self._timestamps[slot])
+
+            # Validation après copie : si le slot a été réservé pour une réécriture (avant ou
+            # pendant la lecture), la copie peut être déchirée et on la jette
+            if overwrite and self._claim_count - r > self.capacity:
+                self._dropped_oldest += 1
+                self._read_count = r + 1
+                continue
+
+            self._read_count = r + 1
+            return AudioBlock(
+                samples=samples,
+                sample_rate=self.sample_rate,
+                timestamp=timestamp,
+                sample_index=sample_index
+            )
+
+    def pop_wait(self, timeout: float, poll_interval: float = 0.002) -> AudioBlock | None:
+        """
+        Comme pop(), mais attend un bloc jusqu'à `timeout` secondes. L'attente se fait par
+        petites pauses côté consommateur : le producteur n'a jamais d'événement à signaler.
+        """
+        deadline = time.monotonic() + timeout
+        while self._read_count >= self._write_count:
+            if time.monotonic() >= deadline:
+                self._underflows += 1
+                return None
+            time.sleep(poll_interval)
+        return self.pop()
+
+    def pop_batch(self, max_blocks: int) -> list[AudioBlock]:
+        """Vide jusqu'à `max_blocks` blocs disponibles, dans l'ordre. Une file vide n'est pas un underflow."""
+        blocks = []
+        while len(blocks) < max_blocks and self._read_count < self._write_count:
+            block = self.pop()
+            if block is None:
+                break
+            blocks.append(block)
+        return blocks
+
+    def clear(self) -> None:
+        self._read_count = self._write_count
+
+    # --- Statistiques ---
+
+    @property
+    def overflows(self) -> int:
+        # Blocs déjà écrasés (drop_oldest) que le consommateur n'a pas encore sautés
+        pending = 0
+        if self.overflow_policy == OVERFLOW_DROP_OLDEST:
+            pending = max(0, self._write_count - self._read_count - self.capacity)
+        return self._dropped_newest + self._dropped_oldest + pending
+
+    @property
+    def underflows(self) -> int:
+        return self._underflows
+
+    def get_stats(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "available": self.available(),
+            "overflows": self.overflows,
+            "underflows": self.underflows,
+            "policy": self.overflow_policy,
+        }
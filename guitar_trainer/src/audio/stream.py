@@ -1,17 +1,16 @@
-import queue
-import time
 import numpy as np
 import sounddevice as sd
 from ..core.config import AppConfig
-from ..core.types import AudioBlock
 
 # On veut que ça plante si le fichier ou la librairie n'est pas là !
 from .processor import AudioProcessor
+from .ringbuffer import AudioRingBuffer
+from .clock import StreamClock
 
 class AudioStream:
     def __init__(self, cfg: AppConfig):
         self.cfg = cfg
-        self.queue: "queue.Queue[AudioBlock]" = queue.Queue()
+        self.ring = self._create_ring()
         self.stream = None
         self.running = False
         self._last_rms = 0.0
@@ -19,6 +18,20 @@ class AudioStream:
         self._playback_buffer = None
         self._playback_pos = 0
 
+        # Compteur d'échantillons depuis le démarrage du flux (horodatage des blocs)
+        self._sample_counter = 0
+        self.clock = StreamClock(cfg.sample_rate)
+        # Buffer préalloué du callback pour le mixage du sample en lecture
+        self._mix_buffer = np.zeros(cfg.block_size, dtype=np.float32)
+
+    def _create_ring(self) -> AudioRingBuffer:
+        return AudioRingBuffer(
+            capacity=self.cfg.ring_capacity_blocks,
+            block_size=self.cfg.block_size,
+            sample_rate=self.cfg.sample_rate,
+            overflow_policy=self.cfg.ring_overflow_policy
+        )
+
     def start(self) -> None:
         if self.running:
             return
@@ -37,6 +50,11 @@ class AudioStream:
         self.processor = AudioProcessor(self.cfg.sample_rate, self.cfg.block_size)
         self.processor.set_gate_threshold(self.cfg.gate_threshold)
         self.processor.set_tone(self.cfg.tone)
+        # La file est recréée à chaque démarrage (le sample rate a pu changer)
+        self.ring = self._create_ring()
+        self._sample_counter = 0
+        self.clock.reset(self.cfg.sample_rate)
+        self._mix_buffer = np.zeros(self.cfg.block_size, dtype=np.float32)
         print("[AUDIO] Pedalboard Processor initialized SUCCESS.")
         # -------------------------------
 
@@ -71,8 +89,14 @@ class AudioStream:
     def is_running(self) -> bool:
         return self.running
 
-    def get_queue(self) -> "queue.Queue[AudioBlock]":
-        return self.queue
+    def get_ring(self) -> AudioRingBuffer:
+        return self.ring
+
+    def get_clock(self) -> StreamClock:
+        return self.clock
+
+    def get_ring_stats(self) -> dict:
+        return self.ring.get_stats()
 
     def get_last_rms(self) -> float:
         return self._last_rms
@@ -81,46 +105,54 @@ class AudioStream:
         if status:
             pass # Ignorer les erreurs xrun pour l'instant
 
-        # 1. Copie pour Analyse
-        samples = indata.flatten().copy()
-        self._last_rms = self._compute_rms(samples)
+        # indata / outdata sont déjà des tableaux float32 contigus (frames x channels) :
+        # on lit et on écrit directement dedans, sans copie intermédiaire.
+        mono_in = indata[:, 0]
 
-        block = AudioBlock(
-            samples=samples,
-            sample_rate=self.cfg.sample_rate,
-            timestamp=time.time()
-        )
-        try:
-            self.queue.put_nowait(block)
-        except queue.Full:
-            pass
+        # 1. Copie pour Analyse : dans un slot préalloué de la file SPSC (sans verrou)
+        self._last_rms = self._compute_rms(mono_in)
+        timestamp = self.clock.on_callback(time_info, self._sample_counter)
+        self.ring.push(mono_in, self._sample_counter, timestamp)
+        self._sample_counter += frames
 
-        # 2. Mixage du sample en lecture dans le signal d'entrée
-        mix = np.array(indata, dtype='float32', copy=True)
+        # 2. Mixage du sample en lecture dans le signal d'entrée (seulement s'il y en a un)
+        source = mono_in
         if self._playback_buffer is not None:
+            if frames > len(self._mix_buffer):
+                # Bloc plus grand que prévu (l'hôte peut livrer plus que block_size) : le buffer
+                # est agrandi une fois pour toutes plutôt que de sauter le mixage
+                self._mix_buffer = np.zeros(frames, dtype=np.float32)
+            mix = self._mix_buffer[:frames]
+            np.copyto(mix, mono_in)
             buf = self._playback_buffer
             pos = self._playback_pos
             remaining = len(buf) - pos
             n = min(frames, remaining)
-            mix[:n, 0] += buf[pos:pos + n]
+            mix[:n] += buf[pos:pos + n]
             self._playback_pos += n
             if self._playback_pos >= len(buf):
                 self._playback_buffer = None
                 self._playback_pos = 0
+            source = mix
 
-        # 3. Traitement Audio
+        # 3. Traitement Audio : la chaîne écrit directement dans le premier canal de sortie
+        out_first = outdata[:, 0]
         if self.processor:
             try:
-                input_contiguous = np.ascontiguousarray(mix.T, dtype='float32')
-                processed_matrix = self.processor.process(input_contiguous)
-                outdata[:] = processed_matrix.T
+                self.processor.process(source, out=out_first)
             except Exception:
-                outdata[:] = mix
+                np.copyto(out_first, source)
         else:
-            outdata[:] = mix
+            np.copyto(out_first, source)
+
+        # Recopie vers les autres canaux de sortie (comportement d'origine : mono dupliqué)
+        for ch in range(1, outdata.shape[1]):
+            outdata[:, ch] = out_first
 
     def _compute_rms(self, samples: np.ndarray) -> float:
-        return float(np.sqrt(np.mean(samples**2)))
+        if len(samples) == 0:
+            return 0.0
+        return float(np.sqrt(np.dot(samples, samples) / len(samples)))
     
     def set_gate_threshold(self, value: float) -> None:
         if self.processor:
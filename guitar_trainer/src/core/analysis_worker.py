@@ -0,0 +1,67 @@
+import threading
+from typing import Callable, Sequence
+from ..audio.stream import AudioStream
+from .types import AudioBlock
+
+
+class AnalysisWorker:
+    """
+    Thread d'analyse : consomme les blocs de la file audio dès leur arrivée et les transmet
+    à `on_blocks` (extraction des features, publication dans AppState, moteurs de jeu).
+    Après un retard, tous les blocs en attente sont livrés ensemble, dans l'ordre.
+    La boucle Pygame n'a plus qu'à lire des snapshots.
+    """
+
+    def __init__(self, audio: AudioStream, on_blocks: Callable[[Sequence[AudioBlock]], None],
+                 poll_timeout: float = 0.1, max_batch: int = 32):
+        self.audio = audio
+        self.on_blocks = on_blocks
+        self.poll_timeout = poll_timeout
+        self.max_batch = max_batch
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def start(self) -> None:
+        if self.is_running():
+            return
+        if self._thread is not None:
+            # Arrêt précédent pas encore terminé : un second consommateur sur la file SPSC
+            # est exclu, on attend l'ancien thread avant de repartir
+            self._thread.join(timeout=1.0)
+            if self._thread.is_alive():
+                print("[ANALYSIS] Previous worker thread still running, not restarting")
+                return
+            self._thread = None
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="analysis", daemon=True)
+        self._thread.start()
+        print("[ANALYSIS] Worker thread started")
+
+    def stop(self) -> None:
+        if not self.is_running():
+            return
+        self._stop_event.set()
+        self._thread.join(timeout=1.0)
+        if self._thread.is_alive():
+            # Le thread termine encore un lot (moteurs en cours de mise à jour) : on garde
+            # son handle, start() l'attendra
+            print("[ANALYSIS] Worker thread did not stop within 1s, still finishing")
+            return
+        self._thread = None
+        print("[ANALYSIS] Worker thread stopped")
+
+    def is_running(self) -> bool:
+        """Thread actif et pas en cours d'arrêt."""
+        return self._thread is not None and self._thread.is_alive() and not self._stop_event.is_set()
+
+    def _run(self) -> None:
+        ring = self.audio.get_ring()
+        while not self._stop_event.is_set():
+            block = ring.pop_wait(self.poll_timeout)
+            if block is None:
+                continue
+            blocks = [block] + ring.pop_batch(self.max_batch - 1)
+            try:
+                self.on_blocks(blocks)
+            except Exception as e:
+                print(f"[ANALYSIS ERROR] {e}")
@@ -13,6 +13,10 @@ class AppConfig:
     # Sortie (Enceintes PC)
     output_device_name_or_index: str | int | None = None 
     
+    # File audio callback -> analyse (blocs préalloués)
+    ring_capacity_blocks: int = 64
+    ring_overflow_policy: str = "drop_oldest"  # ou "drop_newest"
+
     # Effets / Traitement
     gate_threshold: float = 0.15
     tone: float = 0.12  # Valeur par défaut du Tone
@@ -23,10 +27,48 @@ class AppConfig:
     confidence_threshold: float = 0.2
     rms_threshold: float = 0.01
     flatness_threshold: float = 0.15
+    # Backend du pitch : "aubio" (YIN en C) ou "numpy" (YIN par FFT, sans Aubio)
+    pitch_backend: str = "aubio"
+    # Pitch : flux décimé vers ~pitch_sample_rate (limité par fmax), fenêtre en ms,
+    # pas d'analyse en échantillons d'entrée (indépendant de block_size)
+    pitch_sample_rate: int = 11025
+    pitch_window_ms: float = 60.0
+    analysis_hop_size: int = 512
+    # Multi-résolution : fenêtre courte pour les aigus, longue seulement sous le seuil de registre
+    pitch_multires: bool = True
+    pitch_short_window_ms: float = 20.0
+    pitch_register_split_hz: float = 180.0
     
+    # --- Détection des coups en jeu ---
+    hit_detector: str = "yin"           # ou "goertzel" : banc accordé sur les notes attendues
+    goertzel_window_ms: float = 190.0   # historique max (notes graves)
+    goertzel_confirm_blocks: int = 2    # blocs consécutifs reconnus pour valider un coup
+
     # --- Stabilité ---
     stable_window_ms: float = 500.0
     stable_cents_tolerance: float = 15.0
+    # Écart-type max (cents) sur la fenêtre pour être stable (0 = pas de contrainte)
+    stable_max_std_cents: float = 0.0
+    # Spectrogramme en fréquence logarithmique (bins par demi-ton, entre deux notes)
+    spectrogram_fmin_note: str = "E2"
+    spectrogram_fmax_note: str = "D6"
+    spectrogram_bins_per_semitone: int = 2
+    # Détection par gabarits : profils des samples du Studio (hit_detector = "template")
+    samples_dir: str = "data/samples"
+    template_window_ms: float = 190.0
+    template_min_score: float = 0.8  # similarité cosinus minimale avec le profil
+    template_confirm_blocks: int = 2
+    # Accords (chroma) : activé par les quêtes d'accords, ou en permanence avec `polyphonic`
+    polyphonic: bool = False
+    chord_window_ms: float = 190.0
+    chord_min_score: float = 0.85   # similarité cosinus minimale avec le gabarit
+    chord_confirm_blocks: int = 2
+    # Attaques (flux spectral) : le timing est mesuré à l'attaque, la note confirmée ensuite
+    onset_window_size: int = 512
+    onset_hop_size: int = 128
+    onset_threshold: float = 0.1
+    onset_min_interval_ms: float = 50.0
+    onset_confirm_ms: float = 800.0  # délai max entre l'attaque et la confirmation de la note
     
     # --- UI ---
     window_title: str = "Guitar Trainer MVP"
@@ -45,3 +87,49 @@ def validate_config(cfg: AppConfig) -> None:
         raise ValueError("Sample rate must be positive")
     if cfg.fmin >= cfg.fmax:
         raise ValueError("fmin must be lower than fmax")
+    if cfg.analysis_hop_size <= 0:
+        raise ValueError("Analysis hop size must be positive")
+    if cfg.pitch_backend not in ("aubio", "numpy"):
+        raise ValueError("Pitch backend must be 'aubio' or 'numpy'")
+    if cfg.pitch_sample_rate <= 0:
+        raise ValueError("Pitch sample rate must be positive")
+    if cfg.pitch_window_ms <= 0:
+        raise ValueError("Pitch window must be positive")
+    if not 0 < cfg.pitch_short_window_ms <= cfg.pitch_window_ms:
+        raise ValueError("Short pitch window must be positive and not longer than the pitch window")
+    if cfg.pitch_window_ms / 1000.0 * cfg.sample_rate < cfg.analysis_hop_size:
+        raise ValueError("Pitch window must be at least one hop long")
+    if cfg.hit_detector not in ("yin", "goertzel", "template"):
+        raise ValueError("Hit detector must be 'yin', 'goertzel' or 'template'")
+    if cfg.goertzel_window_ms <= 0:
+        raise ValueError("Goertzel window must be positive")
+    if cfg.goertzel_confirm_blocks < 1:
+        raise ValueError("Goertzel confirmation needs at least one block")
+    if cfg.stable_max_std_cents < 0:
+        raise ValueError("Stability std limit cannot be negative")
+    if cfg.onset_hop_size <= 0 or cfg.onset_window_size < cfg.onset_hop_size:
+        raise ValueError("Onset window must be at least one hop long")
+    if cfg.onset_threshold <= 0:
+        raise ValueError("Onset threshold must be positive")
+    if cfg.onset_min_interval_ms < 0:
+        raise ValueError("Onset minimum interval cannot be negative")
+    if cfg.onset_confirm_ms <= 0:
+        raise ValueError("Onset confirmation delay must be positive")
+    if cfg.spectrogram_bins_per_semitone < 1:
+        raise ValueError("Spectrogram needs at least one bin per semitone")
+    if cfg.template_window_ms <= 0:
+        raise ValueError("Template window must be positive")
+    if not 0 < cfg.template_min_score <= 1:
+        raise ValueError("Template minimum score must be in (0, 1]")
+    if cfg.template_confirm_blocks < 1:
+        raise ValueError("Template confirmation needs at least one block")
+    if cfg.chord_window_ms <= 0:
+        raise ValueError("Chord window must be positive")
+    if not 0 < cfg.chord_min_score <= 1:
+        raise ValueError("Chord minimum score must be in (0, 1]")
+    if cfg.chord_confirm_blocks < 1:
+        raise ValueError("Chord confirmation needs at least one block")
+    if cfg.ring_capacity_blocks < 2:
+        raise ValueError("Ring capacity must be at least 2 blocks")
+    if cfg.ring_overflow_policy not in ("drop_oldest", "drop_newest"):
+        raise ValueError("Ring overflow policy must be 'drop_oldest' or 'drop_newest'")
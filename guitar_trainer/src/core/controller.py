@@ -1,4 +1,4 @@
-import queue
+import threading
 from .config import AppConfig
 from .state import AppState
 from ..audio.stream import AudioStream
@@ -6,6 +6,7 @@ from ..analysis.features import FeatureExtractor
 from .campaign import CampaignManager
 from ..game.engine import GameEngine
 from ..game.studio_engine import StudioEngine
+from .analysis_worker import AnalysisWorker
 
 class AppController:
     def __init__(self, cfg: AppConfig, state: AppState, audio: AudioStream):
@@ -17,13 +18,28 @@ class AppController:
         self.studio_engine = StudioEngine(cfg)
         self.campaign_manager = CampaignManager()	
         self.active_mode = "game" # 'game' ou 'studio'
+
+        # Les moteurs sont alimentés par le thread d'analyse (cadence des blocs audio)
+        # et, sans audio, par la boucle Pygame : le verrou sérialise les deux.
+        self.engine_lock = threading.RLock()
+        self.analysis_worker = AnalysisWorker(audio, self._process_blocks)
+        # Fin (en échantillons) du dernier bloc livré aux moteurs, pour dériver les dt
+        self._next_sample_index = None
 	
     def start_audio(self) -> None:
+        self._next_sample_index = None
+        with self.engine_lock:
+            self.game_engine.resync_clock()
         self.audio.start()
-        self.state.set_audio_running(True)
+        self.state.set_audio_running(self.audio.is_running())
+        if self.audio.is_running():
+            self.analysis_worker.start()
 
     def stop_audio(self) -> None:
+        self.analysis_worker.stop()
         self.audio.stop()
+        with self.engine_lock:
+            self.game_engine.resync_clock()
         self.state.set_audio_running(False)
 
     def toggle_audio(self) -> None:
@@ -33,27 +49,80 @@ class AppController:
             self.start_audio()
 
     def update(self, dt: float = 0.016) -> None:
-        audio_queue = self.audio.get_queue()
-        last_features = None
-        
+        """
+        Appelée à chaque frame Pygame. Quand le thread d'analyse tourne, l'analyse et les
+        moteurs avancent à la cadence des blocs audio : il n'y a rien à faire ici.
+        Sans audio, on fait seulement avancer le temps des moteurs (notes qui défilent).
+        """
+        if self.analysis_worker.is_running():
+            return
+
+        with self.engine_lock:
+            self._dispatch_features(None, dt)
+
+    def _process_blocks(self, blocks) -> None:
+        """
+        Thread d'analyse : blocs audio -> flux de features -> état partagé -> moteurs.
+        Chaque bloc est livré aux moteurs, dans l'ordre : un retard ne fait plus perdre de coups.
+        """
+        stream = list(self._feature_stream(blocks))
+        with self.engine_lock:
+            for features, dt in stream:
+                self._dispatch_features(features, dt)
+            self.extractor.set_expected_notes(self._expected_notes())
+            self.extractor.set_expected_positions(self.game_engine.get_expected_positions()
+                                                  if self.active_mode == "game" else [])
+            self.extractor.set_chord_detection(self.active_mode == "game" and self.game_engine.expects_chords())
+            self.extractor.set_onset_detection(self.active_mode == "game" and self.game_engine.expects_onsets())
+
+    def _expected_notes(self) -> list[str]:
+        """Notes que le joueur doit jouer (cibles du jeu ou du studio), la plus proche en premier."""
+        if self.active_mode == "game":
+            return self.game_engine.get_expected_notes()
+        if self.active_mode == "studio":
+            target = self.studio_engine.get_current_target()
+            return [target["note"]] if target else []
+        return []
 
-        try:
-            while True:
-                block = audio_queue.get_nowait()
-                features = self.extractor.process(block)
-                last_features = features
-        except queue.Empty:
-            pass
+    def _feature_stream(self, blocks):
+        """Génère les couples (features, dt) dans l'ordre des blocs."""
+        # Plusieurs blocs en retard : analyse spectrale groupée (un seul passage vectorisé)
+        for block, features in zip(blocks, self.extractor.process_batch(blocks)):
+            self.state.update_features(features)
+            yield features, self._block_dt(block)
 
-        if last_features is not None:
-            self.state.update_features(last_features)
+    def _block_dt(self, block) -> float:
+        """
+        Durée écoulée depuis le bloc précédent, d'après les compteurs d'échantillons.
+        Les blocs perdus par la file sont inclus : le temps des moteurs ne dérive pas.
+        """
+        n = len(block.samples)
+        end = block.sample_index + n
+        if self._next_sample_index is None:
+            elapsed = n
+        else:
+            elapsed = max(0, end - self._next_sample_index)
+        self._next_sample_index = end
+        return elapsed / block.sample_rate
 
+    def _dispatch_features(self, features, dt: float) -> None:
         if self.active_mode == "game":
-            self.game_engine.update(last_features, dt)
+            self.game_engine.update(features, dt)
         elif self.active_mode == "studio":
-            if last_features is not None:
-                self.studio_engine.update(last_features, dt)
-    
+            if features is not None:
+                self.studio_engine.update(features, dt)
+
+    def subscribe(self, topic: str) -> None:
+        """Un écran a besoin d'une feature calculée à la demande (ex: "spectrum" pour le spectrogramme)."""
+        self.state.subscribe(topic)
+
+    def unsubscribe(self, topic: str) -> None:
+        self.state.unsubscribe(topic)
+
+    def get_audio_stats(self) -> dict:
+        """Compteurs de la file audio (débordements / lectures à vide)."""
+        return self.audio.get_ring_stats()
+
     def cycle_input_device(self, direction: int) -> None:
         devices = self.state.get_input_devices()
         if not devices:
@@ -137,6 +206,10 @@ class AppController:
     def set_active_mode(self, mode: str) -> None:
         """Permet à l'UI de router les features vers le bon moteur ('game' ou 'studio')."""
         self.active_mode = mode
+        if mode == "game":
+            # Samples enregistrés au Studio : gabarits calculés maintenant, pas en cours de morceau
+            with self.engine_lock:
+                self.extractor.refresh_templates()
         print(f"[CONTROLLER] Mode set to: {self.active_mode}")
     
     def play_sample(self, samples) -> None:
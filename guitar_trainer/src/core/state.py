@@ -6,12 +6,22 @@ import numpy as np
 class AppState:
     def __init__(self):
         self._features = None
+        self._features_version = 0
         self._lock = threading.Lock()
         self._events = AppEvents()
         
-        # Données historiques (gérées en interne maintenant)
-        self._spectrogram_history = [] 
+        # Historique du spectrogramme : anneau préalloué (max_history, n_bins) en float32.
+        # Alloué au premier spectre (n_bins : bins logarithmiques) ; `_spec_count` = spectres écrits.
         self.max_history = 300
+        self._spec_ring = None
+        self._spec_count = 0
+        self._spec_version = 0
+        # Dernière copie ordonnée servie aux lecteurs, réutilisée tant que la version n'a pas bougé
+        self._spec_snapshot = None
+        self._spec_snapshot_version = -1
+
+        # Abonnements aux features coûteuses calculées à la demande (ex: "spectrum" -> nb de lecteurs)
+        self._subscribers = {}
 
         # Stockage des périphériques
         self._input_devices = []
@@ -24,40 +34,83 @@ class AppState:
         """
         Appelé par le thread d'analyse.
         Met à jour les features courantes ET gère l'historique du spectrogramme.
+        L'historique n'est alimenté (et le spectre calculé) que si un écran y est abonné.
         """
+        spectrum = f.log_spectrum if self.has_subscribers("spectrum") else None  # FFT hors verrou
         with self._lock:
-            self._features = f
+            # Publication d'un nouvel objet immuable, numéroté
+            self._features_version += 1
+            self._features = replace(f, version=self._features_version)
             
-            # Gestion centralisée de l'historique
-            if f.spectrum is not None:
-                self._spectrogram_history.append(f.spectrum)
-                # On garde une taille fixe
-                if len(self._spectrogram_history) > self.max_history:
-                    self._spectrogram_history.pop(0)
+            # Gestion centralisée de l'historique : écriture d'une ligne de l'anneau, sans allocation
+            if spectrum is not None:
+                n_bins = len(spectrum)
+                if self._spec_ring is None or self._spec_ring.shape[1] != n_bins:
+                    self._spec_ring = np.zeros((self.max_history, n_bins), dtype=np.float32)
+                    self._spec_count = 0
+                np.copyto(self._spec_ring[self._spec_count % self.max_history], spectrum, casting="unsafe")
+                self._spec_count += 1
+                self._spec_version += 1
 
     def get_features_snapshot(self) -> Features | None:
+        """
+        Dernières features publiées. L'objet est immuable (tableaux en lecture seule) : il est
+        renvoyé sans copie, et reste le même objet tant qu'aucun nouveau bloc n'a été publié.
+        """
         with self._lock:
-            if self._features is None:
-                return None
-            
-            snap = replace(self._features)
-            # Deep copy des tableaux numpy pour éviter les accès concurrents
-            if snap.spectrum is not None:
-                snap.spectrum = snap.spectrum.copy()
-            if snap.samples is not None:
-                snap.samples = snap.samples.copy()
-            return snap
+            return self._features
 
-    def get_spectrogram_history(self) -> list[np.ndarray]:
-        """Retourne une copie sécurisée de l'historique pour l'affichage."""
+    def get_features_version(self) -> int:
         with self._lock:
-            # On renvoie une copie de la liste pour éviter les conflits de lecture/écriture
-            return list(self._spectrogram_history)
+            return self._features_version
+
+    def subscribe(self, topic: str) -> None:
+        with self._lock:
+            self._subscribers[topic] = self._subscribers.get(topic, 0) + 1
+
+    def unsubscribe(self, topic: str) -> None:
+        with self._lock:
+            count = self._subscribers.get(topic, 0) - 1
+            if count > 0:
+                self._subscribers[topic] = count
+            else:
+                self._subscribers.pop(topic, None)
+
+    def has_subscribers(self, topic: str) -> bool:
+        with self._lock:
+            return self._subscribers.get(topic, 0) > 0
+
+    def get_spectrogram_version(self) -> int:
+        """Compteur incrémenté à chaque nouveau spectre (ou remise à zéro de l'historique)."""
+        with self._lock:
+            return self._spec_version
+
+    def get_spectrogram_history(self) -> np.ndarray:
+        """
+        Historique ordonné (du plus ancien au plus récent), tableau (n, n_bins) en lecture seule.
+        La copie n'est refaite que si un nouveau spectre est arrivé depuis le dernier appel.
+        """
+        with self._lock:
+            if self._spec_snapshot_version != self._spec_version:
+                self._spec_snapshot = self._ordered_history()
+                self._spec_snapshot.flags.writeable = False
+                self._spec_snapshot_version = self._spec_version
+            return self._spec_snapshot
+
+    def _ordered_history(self) -> np.ndarray:
+        if self._spec_ring is None:
+            return np.zeros((0, 0), dtype=np.float32)
+        count = min(self._spec_count, self.max_history)
+        start = self._spec_count % self.max_history
+        if self._spec_count <= self.max_history:
+            return self._spec_ring[:count].copy()
+        return np.concatenate([self._spec_ring[start:], self._spec_ring[:start]])
 
     def reset_history(self) -> None:
         """Vide l'historique (utile lors du changement de périphérique/SR)."""
         with self._lock:
-            self._spectrogram_history.clear()
+            self._spec_count = 0
+            self._spec_version += 1
 
     def set_audio_running(self, running: bool) -> None:
         with self._lock:
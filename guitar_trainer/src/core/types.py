@@ -1,29 +1,93 @@
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 import numpy as np
 
+if TYPE_CHECKING:
+    from ..analysis.spectrum import BlockSpectrum
+
 @dataclass
 class AudioBlock:
     """Représente un paquet d'échantillons audio bruts."""
     samples: np.ndarray  # float32
     sample_rate: int
-    timestamp: float     # temps système
+    timestamp: float     # temps du premier échantillon (horloge du flux, base perf_counter)
+    sample_index: int = 0  # index du premier échantillon depuis le démarrage du flux
 
 
-@dataclass
+@dataclass(frozen=True)
+class StabilityStats:
+    """Statistiques de l'écart (cents) sur la fenêtre de stabilité (frames voisées consécutives)."""
+    frames: int = 0
+    mean_cents: float = 0.0
+    std_cents: float = 0.0
+    max_abs_cents: float = 0.0
+    min_cents: float = 0.0
+    max_cents: float = 0.0
+    drift_cents_per_s: float = 0.0   # pente : > 0 si la note monte
+    vibrato_rate_hz: float = 0.0
+    vibrato_depth_cents: float = 0.0  # demi-amplitude crête à crête
+
+
+@dataclass(frozen=True)
+class PitchFrame:
+    """Pitch d'une fenêtre d'analyse (un hop), datée par l'index d'échantillon de sa fin."""
+    sample_index: int
+    f0_hz: float
+    confidence: float
+    note_name: str | None  # None si la fenêtre n'est pas "voiced"
+    cents: float
+    is_voiced: bool
+    stable: bool = False
+
+
+@dataclass(frozen=True)
 class Features:
+    """
+    Résultat d'analyse d'un bloc. Immuable : les tableaux sont en lecture seule et un nouvel
+    objet est publié à chaque bloc, les lecteurs peuvent donc le partager sans copie.
+
+    Le spectre (et donc la flatness) n'est calculé qu'au premier accès, puis partagé.
+    """
     timestamp: float
     f0_hz: float
     note_name: str
     cents: float
     rms: float
-    flatness: float
     raw_f0: float
     raw_confidence: float
     is_voiced: bool
-    is_pure: bool
-    spectrum: np.ndarray # Nouveau : les magnitudes de la FFT
     samples: np.ndarray  # Nouveau : les échantillons temporels bruts
     stable: bool = False
+    sample_index: int = 0  # index du premier échantillon du bloc analysé
+    version: int = 0       # numéro de publication dans AppState (0 = non publié)
+    spectral: "BlockSpectrum | None" = None  # spectre du bloc, calculé à la demande
+    flatness_threshold: float = 0.0          # seuil de pureté en vigueur lors de l'analyse
+    target_matches: tuple = ()               # notes attendues confirmées par le banc Goertzel
+    stability: StabilityStats | None = None  # statistiques glissantes de justesse
+    onset_index: int | None = None           # index d'échantillon de l'attaque détectée dans ce bloc
+    position_matches: tuple = ()             # positions (corde, case) reconnues par les gabarits
+    template_targets: tuple = ()             # positions attendues qui ont un gabarit
+    chord: str | None = None                 # accord reconnu (mode polyphonique), ex: "Am"
+    chord_score: float = 0.0                 # similarité du meilleur gabarit d'accord
+    pitch_frames: tuple = ()                 # PitchFrame de chaque fenêtre complétée par le bloc
+
+    @property
+    def spectrum(self) -> np.ndarray | None:
+        """Spectre de puissance de la FFT (calculé au premier accès)."""
+        return self.spectral.power if self.spectral is not None else None
+
+    @property
+    def log_spectrum(self) -> np.ndarray | None:
+        """Spectre en bins logarithmiques (spectrogramme), calculé au premier accès."""
+        return self.spectral.log_power if self.spectral is not None else None
+
+    @property
+    def flatness(self) -> float:
+        return self.spectral.flatness if self.spectral is not None else 1.0
+
+    @property
+    def is_pure(self) -> bool:
+        return self.flatness < self.flatness_threshold
 
 @dataclass
 class AppEvents:
@@ -36,4 +100,5 @@ class PitchResult:
     frequency: float
     confidence: float
     note_name: str | None
-    cents: float
\ No newline at end of file
+    cents: float
+    sample_index: int = 0  # fin de la fenêtre analysée (index d'échantillon du flux)
\ No newline at end of file
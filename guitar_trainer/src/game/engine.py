@@ -1,10 +1,16 @@
 import random
 import time
+from collections import deque
 from dataclasses import dataclass
 from .guitar_map import GUITAR_MAP
 from .settings import GameSettings
+from .tempo_map import TempoMap
+from ..analysis.chroma import canonical_chord
 from ..core.highscore import HighScoreManager
 
+# Lissage de l'origine d'affichage, recalée à chaque bloc sur son heure d'arrivée
+_DISPLAY_ORIGIN_SMOOTHING = 0.05
+
 # --- ÉTATS DU JEU ---
 STATE_IDLE = "IDLE"           
 STATE_PICK = "PICK_NOTE"      
@@ -26,6 +32,7 @@ class GameStats:
 
 class GameEngine:
     def __init__(self, cfg, controller=None):
+        self.cfg = cfg
         self.controller = controller
         self.state = STATE_IDLE
         self.settings = GameSettings()
@@ -43,9 +50,19 @@ class GameEngine:
         self.reaction_time = 0.0
         self.quest_mode = False
         self.quest_data = None
+        self.sequence = []  # séquence de la quête, validée au chargement
         self.current_campaign_id = None
         self.song_time_beats = 0.0
         self.next_note_idx = 0
+        # Position du morceau en échantillons (0 = début du décompte), pilotée par l'horloge audio
+        self.tempo_map = None
+        self.song_sample = 0.0
+        # Index d'échantillon (flux) du début du morceau, et instant perf_counter lissé du
+        # début du morceau d'après l'arrivée des blocs (affichage uniquement)
+        self.song_origin_sample = None
+        self.song_origin_time = None
+        # Attaques récentes (en beats), en attente de la confirmation de la note
+        self.onset_beats = deque(maxlen=16)
 	
         # scoring quêtes
         self.max_quest_score = 0
@@ -57,20 +74,42 @@ class GameEngine:
     def load_quest(self, campaign_id, quest_data):
         self.quest_mode = True
         self.quest_data = quest_data
+        self.sequence = self._load_sequence(quest_data["params"])
         self.current_campaign_id = campaign_id
         self.active_notes = []
         self.next_note_idx = 0
         self.song_time_beats = -4.0
+        self.tempo_map = TempoMap.from_params(quest_data["params"], self.cfg.sample_rate, start_beat=-4.0)
+        self.song_sample = 0.0
+        self.song_origin_sample = None
+        self.song_origin_time = None
+        self.onset_beats.clear()
         
         self.start_game()
         self.stats.lives = quest_data["params"].get("max_lives", 0)
         
-        count = len(quest_data["params"].get("sequence", []))
+        count = len(self.sequence)
         self.max_quest_score = (count * 300) + (self.stats.lives * 500)
         
         self.hit_history = [] # Reset du radar à chaque début de quête
         self.initialized = True
 
+    def _load_sequence(self, params) -> list[dict]:
+        """
+        Séquence de la quête avec les noms d'accords normalisés. Un accord inconnu est ignoré
+        (message au chargement) : il ne pourrait jamais être reconnu.
+        """
+        sequence = []
+        for entry in params.get("sequence", []):
+            if "chord" in entry:
+                try:
+                    entry = {**entry, "chord": canonical_chord(entry["chord"])}
+                except ValueError:
+                    print(f"[GAME] Unknown chord '{entry['chord']}' at beat {entry.get('beat')}: skipped")
+                    continue
+            sequence.append(entry)
+        return sequence
+
     def start_game(self):
         # Initialisation propre des statistiques
         self.stats = GameStats()
@@ -82,6 +121,115 @@ class GameEngine:
         self.target_position = None
         print(f"[GAME] START! Multiplier: x{self.stats.multiplier}")
 
+    def resync_clock(self):
+        """
+        L'horloge du flux a été réinitialisée (démarrage/arrêt audio, changement de sample
+        rate) : on garde la position courante du morceau et on le réancrera au prochain bloc.
+        """
+        self.song_origin_sample = None
+        self.song_origin_time = None
+        if self.tempo_map is not None and self.tempo_map.sample_rate != self.cfg.sample_rate:
+            self.tempo_map = TempoMap.from_params(self.quest_data["params"], self.cfg.sample_rate,
+                                                  start_beat=self.tempo_map.start_beat)
+            self.song_sample = self.tempo_map.sample_at_beat(self.song_time_beats)
+
+    def get_display_beats(self) -> float:
+        """
+        Position du morceau pour l'affichage. Entre deux blocs audio, elle est extrapolée depuis
+        l'arrivée des derniers blocs traités : les notes défilent sans à-coups, quelle que soit
+        la cadence d'affichage, et sans dériver de l'horloge de la carte son.
+        """
+        if (not self.quest_mode or self.song_origin_time is None
+                or self.state in [STATE_IDLE, STATE_GAME_OVER, STATE_VICTORY]):
+            return self.song_time_beats
+        sample = (time.perf_counter() - self.song_origin_time) * self.tempo_map.sample_rate
+        return self.tempo_map.beat_at_sample(sample)
+
+    def _advance_song(self, features, dt: float) -> None:
+        """Avance la position du morceau : compteur d'échantillons du flux audio, ou dt sans audio."""
+        sr = self.tempo_map.sample_rate
+        if features is None:
+            self.song_sample += dt * sr
+        else:
+            if self.song_origin_sample is None:
+                # Ancrage : le début de ce bloc correspond à la position courante du morceau
+                self.song_origin_sample = features.sample_index - self.song_sample
+            self.song_sample = features.sample_index + len(features.samples) - self.song_origin_sample
+            # Origine d'affichage recalée sur chaque bloc (fin du bloc = maintenant), lissée contre
+            # la gigue de traitement : l'horloge de la carte son peut dériver de perf_counter
+            origin = time.perf_counter() - self.song_sample / sr
+            if self.song_origin_time is None:
+                self.song_origin_time = origin
+            else:
+                self.song_origin_time += _DISPLAY_ORIGIN_SMOOTHING * (origin - self.song_origin_time)
+        self.song_time_beats = self.tempo_map.beat_at_sample(self.song_sample)
+
+    def _beat_at(self, sample_index: int) -> float:
+        """Beat correspondant à un index d'échantillon du flux (instant de capture)."""
+        return self.tempo_map.beat_at_sample(sample_index - self.song_origin_sample)
+
+    def _latest_onset(self) -> float | None:
+        """
+        Attaque (en beats) du son confirmé par le bloc courant : la plus récente entendue jusqu'à
+        ce bloc, si elle date de moins de `onset_confirm_ms`. None sinon (attaque non détectée).
+        """
+        if not self.onset_beats:
+            return None
+        onset = self.onset_beats[-1]
+        confirm_beats = self.cfg.onset_confirm_ms / 1000.0 * self.tempo_map.tempo_at_beat(onset) / 60.0
+        return onset if self.song_time_beats <= onset + confirm_beats else None
+
+    def _awaiting_confirmation(self, note, tol_t: float) -> bool:
+        """La dernière attaque est à temps pour la note, qui peut encore être confirmée."""
+        onset = self._latest_onset()
+        return onset is not None and abs(onset - note["beat"]) <= tol_t
+
+    def get_expected_notes(self, limit: int = 3) -> list[str]:
+        """Prochaines notes à jouer (la plus proche en premier), pour orienter l'analyse."""
+        if self.state in [STATE_IDLE, STATE_GAME_OVER, STATE_VICTORY]:
+            return []
+        if self.quest_mode:
+            pending = [n["note"] for n in self.active_notes if n["status"] == "pending" and not n["chord"]]
+            return list(dict.fromkeys(pending))[:limit]
+        return [self.target_note] if self.target_note else []
+
+    def get_expected_positions(self, limit: int = 3) -> list[tuple[int, int]]:
+        """Prochaines positions (corde, case) à jouer, pour la détection par gabarits."""
+        if self.state in [STATE_IDLE, STATE_GAME_OVER, STATE_VICTORY]:
+            return []
+        if self.quest_mode:
+            pending = [(n["string"], n["fret"]) for n in self.active_notes
+                       if n["status"] == "pending" and not n["chord"]]
+            return list(dict.fromkeys(pending))[:limit]
+        return [self.target_position] if self.target_position else []
+
+    def expects_onsets(self) -> bool:
+        """Une quête est en cours : son timing est mesuré aux attaques."""
+        return self.quest_mode and self.state not in [STATE_IDLE, STATE_GAME_OVER, STATE_VICTORY]
+
+    def expects_chords(self) -> bool:
+        """La quête en cours contient des accords : l'analyse doit reconnaître les accords."""
+        if not self.quest_mode or self.state in [STATE_IDLE, STATE_GAME_OVER, STATE_VICTORY]:
+            return False
+        return any("chord" in n for n in self.sequence)
+
+    def _find_hit(self, features, note, chord: bool = False, position=None) -> tuple[int, float] | None:
+        """
+        Coup validé : accord reconnu, gabarit du sample de la position (mode "template"), banc de
+        détecteurs accordé (mode "goertzel") ou note YIN stable. Sans sample, repli sur YIN.
+        Retourne (index d'échantillon de la validation, écart de justesse en cents) ou None.
+        Avec YIN, le coup est daté par la première fenêtre de pitch (hop) stable du bloc.
+        """
+        if chord:
+            return (features.sample_index, 0.0) if features.chord == note else None
+        block_cents = features.cents if features.note_name == note else 0.0
+        if self.cfg.hit_detector == "template" and position in features.template_targets:
+            return (features.sample_index, block_cents) if position in features.position_matches else None
+        if self.cfg.hit_detector == "goertzel":
+            return (features.sample_index, block_cents) if note in features.target_matches else None
+        frame = next((f for f in features.pitch_frames if f.note_name == note and f.stable), None)
+        return (frame.sample_index, frame.cents) if frame is not None else None
+
     def update(self, features, dt: float):
         if self.state in [STATE_IDLE, STATE_GAME_OVER, STATE_VICTORY]:
             return
@@ -96,15 +244,26 @@ class GameEngine:
             self._update_arcade_mode(features, dt)
 
     def _update_quest_mode(self, features, dt: float):
-        bpm = self.quest_data["params"]["tempo"]
-        self.song_time_beats += dt * (bpm / 60.0)
+        self._advance_song(features, dt)
+        if features is not None and features.onset_index is not None:
+            self.onset_beats.append(self.tempo_map.beat_at_sample(features.onset_index - self.song_origin_sample))
         tol_t = self.quest_data["params"]["tolerance_timing"]
         tol_p = self.quest_data["params"]["tolerance_pitch"]
-        seq = self.quest_data["params"]["sequence"]
+        seq = self.sequence
 
         while self.next_note_idx < len(seq):
             n = seq[self.next_note_idx]
             if self.song_time_beats + 4.0 >= n["beat"]:
+                if "chord" in n:
+                    # Accord : pas de position unique sur le manche
+                    self.active_notes.append({
+                        "string": None, "fret": None,
+                        "note": n["chord"], "beat": n["beat"],
+                        "status": "pending", "chord": True
+                    })
+                    self.next_note_idx += 1
+                    continue
+
                 note_name = "???"
                 for name, pos_list in GUITAR_MAP.items():
                     if (n["string"], n["fret"]) in pos_list:
@@ -114,33 +273,63 @@ class GameEngine:
                 self.active_notes.append({
                     "string": n["string"], "fret": n["fret"],
                     "note": note_name, "beat": n["beat"],
-                    "status": "pending"
+                    "status": "pending", "chord": False
                 })
                 self.next_note_idx += 1
             else:
                 break
 
         for n in self.active_notes:
-            if n["status"] == "pending" and self.song_time_beats > n["beat"] + tol_t:
+            if (n["status"] == "pending" and self.song_time_beats > n["beat"] + tol_t
+                    and not self._awaiting_confirmation(n, tol_t)):
                 n["status"] = "missed"
                 self._handle_miss()
 
-        target = next((n for n in self.active_notes if n["status"] == "pending"), None)
-        if target:
+        pending = [n for n in self.active_notes if n["status"] == "pending"]
+        if pending:
+            # Cible affichée : première note encore à l'heure (pas celle qui attend sa confirmation)
+            target = next((n for n in pending if self.song_time_beats <= n["beat"] + tol_t), pending[0])
             self.target_note = target["note"]
-            self.target_position = (target["string"], target["fret"])
+            self.target_position = None if target["chord"] else (target["string"], target["fret"])
 
-            if features and features.note_name == target["note"] and features.stable:
-                timing_err = self.song_time_beats - target["beat"]
-                if abs(timing_err) <= tol_t:
-                    target["status"] = "hit"
-                    self._handle_success(timing_err=timing_err, pitch_err=features.cents)
+        if features:
+            # Toute note dont la fenêtre de tolérance est ouverte peut être validée : une note en
+            # attente de confirmation ne bloque pas les suivantes (passages rapides)
+            for n in pending:
+                if self.song_time_beats >= n["beat"] - tol_t and self._score_hit(features, n, tol_t):
+                    break
 
-        self.active_notes = [n for n in self.active_notes if self.song_time_beats < n["beat"] + 1.0]
+        # Les notes en attente de confirmation restent actives jusqu'à leur verdict
+        self.active_notes = [n for n in self.active_notes
+                             if n["status"] == "pending" or self.song_time_beats < n["beat"] + 1.0]
         
         if self.next_note_idx >= len(seq) and not self.active_notes:
             self._handle_victory()
 
+    def _score_hit(self, features, note, tol_t: float) -> bool:
+        """Valide `note` si le bloc la confirme à temps. Retourne True si elle est réussie."""
+        position = None if note["chord"] else (note["string"], note["fret"])
+        hit = self._find_hit(features, note["note"], chord=note["chord"], position=position)
+        if not hit:
+            return False
+        # Timing mesuré à l'attaque du son confirmé (la plus récente, à quelques ms près) : la
+        # note stable ne fait que la confirmer. Une attaque hors tolérance rejette le coup, même
+        # si une attaque plus ancienne (autre note) tombait à temps. Sans attaque, instant de la validation
+        hit_index, pitch_err = hit
+        onset = self._latest_onset()
+        if onset is not None:
+            timing_err = onset - note["beat"]
+        else:
+            timing_err = self._beat_at(hit_index) - note["beat"]
+        if abs(timing_err) > tol_t:
+            return False
+        if onset is not None:
+            # Attaque consommée, avec les plus anciennes : elles ne dateront plus d'autre coup
+            self.onset_beats.clear()
+        note["status"] = "hit"
+        self._handle_success(timing_err=timing_err, pitch_err=pitch_err)
+        return True
+
     def _update_arcade_mode(self, features, dt: float):
         if self.state == STATE_PICK:
             if self.stats.notes_played >= self.settings.total_notes:
@@ -150,7 +339,7 @@ class GameEngine:
             self.state = STATE_LISTEN
             self.state_timer = 0.0
         elif self.state == STATE_LISTEN:
-            if features and features.note_name == self.target_note and features.stable:
+            if features and self._find_hit(features, self.target_note, position=self.target_position):
                 self.reaction_time = self.state_timer
                 self._handle_success()
             elif self.state_timer > self.settings.note_duration:
@@ -7,7 +7,7 @@ from .guitar_map import GUITAR_MAP
 class StudioEngine:
     def __init__(self, cfg):
         self.cfg = cfg
-        self.samples_dir = "data/samples"
+        self.samples_dir = cfg.samples_dir
         os.makedirs(self.samples_dir, exist_ok=True)
 
         self.targets = self._generate_targets()
@@ -0,0 +1,56 @@
+import numpy as np
+
+
+class TempoMap:
+    """
+    Correspondance beats <-> échantillons d'un morceau, précalculée en tableaux.
+
+    Le morceau est découpé en segments de tempo constant. Pour chaque début de segment on
+    stocke son beat, sa position en échantillons et le nombre d'échantillons par beat ;
+    une conversion est alors un searchsorted + une interpolation linéaire (scalaires ou
+    tableaux). L'échantillon 0 correspond au beat `start_beat` (début du décompte).
+    """
+
+    def __init__(self, tempo_changes: list[tuple[float, float]], sample_rate: int, start_beat: float = 0.0):
+        if not tempo_changes:
+            raise ValueError("Tempo map needs at least one tempo")
+        changes = sorted(tempo_changes)
+        if any(bpm <= 0 for _, bpm in changes):
+            raise ValueError("Tempo must be positive")
+
+        # Le premier tempo s'applique dès le début du décompte
+        beats = [start_beat] + [b for b, _ in changes[1:] if b > start_beat]
+        tempos = [changes[0][1]] + [t for b, t in changes[1:] if b > start_beat]
+
+        self.sample_rate = sample_rate
+        self.start_beat = start_beat
+        self._beats = np.asarray(beats, dtype=np.float64)
+        self._samples_per_beat = 60.0 * sample_rate / np.asarray(tempos, dtype=np.float64)
+        self._samples = np.concatenate([[0.0], np.cumsum(np.diff(self._beats) * self._samples_per_beat[:-1])])
+
+    @classmethod
+    def from_params(cls, params: dict, sample_rate: int, start_beat: float = 0.0) -> "TempoMap":
+        """
+        Construit la carte depuis les paramètres d'une quête : "tempo" (BPM initial) et,
+        optionnellement, "tempo_changes" : [{"beat": 16, "tempo": 90}, ...].
+        """
+        changes = [(start_beat, float(params["tempo"]))]
+        for change in params.get("tempo_changes", []):
+            changes.append((float(change["beat"]), float(change["tempo"])))
+        return cls(changes, sample_rate, start_beat)
+
+    def sample_at_beat(self, beat):
+        """Position en échantillons (depuis `start_beat`) d'un beat ou d'un tableau de beats."""
+        i = np.clip(np.searchsorted(self._beats, beat, side="right") - 1, 0, len(self._beats) - 1)
+        result = self._samples[i] + (np.asarray(beat) - self._beats[i]) * self._samples_per_beat[i]
+        return float(result) if np.ndim(result) == 0 else result
+
+    def beat_at_sample(self, sample):
+        """Beat correspondant à une position en échantillons (scalaire ou tableau)."""
+        i = np.clip(np.searchsorted(self._samples, sample, side="right") - 1, 0, len(self._samples) - 1)
+        result = self._beats[i] + (np.asarray(sample) - self._samples[i]) / self._samples_per_beat[i]
+        return float(result) if np.ndim(result) == 0 else result
+
+    def tempo_at_beat(self, beat: float) -> float:
+        i = max(0, int(np.searchsorted(self._beats, beat, side="right")) - 1)
+        return 60.0 * self.sample_rate / float(self._samples_per_beat[i])
@@ -1,6 +1,7 @@
 import pygame
 import math
 import time
+from dataclasses import dataclass
 from .base import Screen
 from ..widgets.knob import Knob
 from ..widgets.text import TextLabel
@@ -17,6 +18,28 @@ COLOR_NOTE_HIT = (0, 255, 0)      # Vert
 COLOR_TEXT = (255, 255, 255)
 COLOR_HEART = (255, 50, 50)       # Rouge Cœur
 
+
+@dataclass(frozen=True)
+class GameView:
+    """Copie des champs du moteur lus par le dessin d'une image (prise sous le verrou)."""
+    quest_mode: bool
+    state: str
+    state_timer: float
+    target_note: str | None
+    target_position: tuple | None
+    display_beats: float
+    active_notes: tuple
+    hit_history: tuple
+    score: int
+    multiplier: float
+    lives: int
+    notes_played: int
+    total_notes: int
+    note_duration: float
+    show_helper: bool
+    top_scores: tuple
+
+
 class GameScreen(Screen):
     def __init__(self, cfg, state, controller):
         super().__init__(cfg, state, controller)
@@ -71,7 +94,8 @@ class GameScreen(Screen):
         # 2. Navigation
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_ESCAPE:
-                engine.stop_game()
+                with self.controller.engine_lock:
+                    engine.stop_game()
                 target = "quest_list" if engine.quest_mode else "menu"
                 self.app.change_screen(target)
                 return
@@ -85,7 +109,8 @@ class GameScreen(Screen):
         # 3. Settings
         if event.type == pygame.MOUSEBUTTONDOWN:
             if event.button == 1 and self.rect_settings.collidepoint(event.pos):
-                engine.stop_game()
+                with self.controller.engine_lock:
+                    engine.stop_game()
                 self.app.change_screen("setup")
                 return
 
@@ -95,31 +120,66 @@ class GameScreen(Screen):
         if feats:
             
             engine = self.controller.game_engine
+            with self.controller.engine_lock:
+                target_note = engine.target_note
+                victory = engine.quest_mode and engine.state == "VICTORY"
             if feats.note_name:
-                is_correct = (feats.note_name == engine.target_note)
+                is_correct = (feats.note_name == target_note)
                 color = (0, 255, 0) if is_correct else (255, 50, 50)
                 self.lbl_detected.set_text(f"ENTENDU : {feats.note_name}", color)
             else:
                 self.lbl_detected.set_text("...", (80, 80, 80))
 
             # Redirection automatique en mode quête pour éviter l'écran de score arcade
-            if engine.quest_mode and engine.state == "VICTORY":
+            if victory:
                 self.app.change_screen("quest_result")
 
     def draw(self, surface):
+        # Le thread d'analyse modifie le moteur : on copie sous le verrou les quelques champs
+        # utiles, puis on dessine hors verrou (l'analyse n'attend pas la fin du rendu)
+        with self.controller.engine_lock:
+            view = self._snapshot()
+        self._draw_frame(surface, view)
+
+    def _snapshot(self) -> GameView:
+        engine = self.controller.game_engine
+        stats = engine.stats
+        settings = engine.settings
+        show_overlay = engine.state in ["GAME_OVER", "VICTORY"] and not engine.quest_mode
+        return GameView(
+            quest_mode=engine.quest_mode,
+            state=engine.state,
+            state_timer=engine.state_timer,
+            target_note=engine.target_note,
+            target_position=engine.target_position,
+            display_beats=engine.get_display_beats() if engine.quest_mode else 0.0,
+            # Le moteur modifie le statut des notes en place : copie de chaque note
+            active_notes=tuple(dict(n) for n in engine.active_notes),
+            hit_history=tuple(engine.hit_history),
+            score=stats.score,
+            multiplier=stats.multiplier,
+            lives=stats.lives,
+            notes_played=stats.notes_played,
+            total_notes=settings.total_notes,
+            note_duration=settings.note_duration,
+            show_helper=settings.show_helper,
+            top_scores=tuple(engine.hs_manager.get_top_scores()) if show_overlay else ()
+        )
+
+    def _draw_frame(self, surface, view: GameView):
         surface.fill(COLOR_BG)
         
         # 1. MANCHE
         self._draw_highway(surface)
         
         # 2. CIBLE
-        self._draw_target(surface)
+        self._draw_target(surface, view)
         
         # 3. HUD
-        self._draw_hud(surface)
+        self._draw_hud(surface, view)
 
         # 4. AIDE
-        self._draw_tab_helper(surface)
+        self._draw_tab_helper(surface, view)
         
         # 5. CONTROLES (Le fond de la barre du bas)
         pygame.draw.rect(surface, (20, 20, 30), self.rect_ctrl)
@@ -139,15 +199,13 @@ class GameScreen(Screen):
 
         # --- 8. LE RADAR DE PRÉCISION ---
         # On l'appelle ici pour qu'il soit dessiné par-dessus tout le reste
-        if self.controller.game_engine.quest_mode:
-            self._draw_precision_radar(surface)
+        if view.quest_mode:
+            self._draw_precision_radar(surface, view)
 
         # 9. OVERLAYS (FIN DE PARTIE)
-        self._draw_game_over_overlay(surface)
+        self._draw_game_over_overlay(surface, view)
     
-    def _draw_precision_radar(self, surface):
-        engine = self.controller.game_engine
-        
+    def _draw_precision_radar(self, surface, view: GameView):
         # Placement : Centré (cx) et dans la barre du bas (cy)
         cx = self.cx
         cy = self.H_GAME + (self.H_CTRL // 2)
@@ -166,7 +224,7 @@ class GameScreen(Screen):
         
         # Dessin du nuage de points (Persistance de 6 secondes)
         now = time.time() * 1000
-        for i, hit in enumerate(engine.hit_history):
+        for i, hit in enumerate(view.hit_history):
             age = now - hit["time"]
             if age > 6000 or age < 0: continue
             
@@ -175,7 +233,7 @@ class GameScreen(Screen):
             px = cx + int(hit["x"] * (radar_size // 2))
             py = cy + int(hit["y"] * (radar_size // 2))
             
-            is_last = (i == len(engine.hit_history) - 1)
+            is_last = (i == len(view.hit_history) - 1)
             color = (0, 255, 255) if is_last else (255, 100, 100)
             radius = 6 if is_last else 4
             
@@ -213,18 +271,17 @@ class GameScreen(Screen):
                          (self.cx - self.neck_bottom_w//2, y_hit), 
                          (self.cx + self.neck_bottom_w//2, y_hit), 4)
 
-    def _draw_target(self, surface):
-        engine = self.controller.game_engine
-        
+    def _draw_target(self, surface, view: GameView):
         # En mode Arcade, on utilise l'ancienne logique de dessin unique
-        if not engine.quest_mode:
-            if engine.state == "IDLE" or not engine.target_position: return
-            self._draw_single_note(surface, engine.target_position, engine.state, engine.state_timer)
+        if not view.quest_mode:
+            if view.state == "IDLE" or not view.target_position: return
+            self._draw_single_note(surface, view.target_position, view.state, view.state_timer, view.note_duration)
             return
 
-        # En mode Quête, on dessine tout le pipeline
-        for n in engine.active_notes:
-            beats_left = n["beat"] - engine.song_time_beats
+        # En mode Quête, on dessine tout le pipeline, positionné sur l'horloge audio
+        song_beats = view.display_beats
+        for n in view.active_notes:
+            beats_left = n["beat"] - song_beats
             
             # Calcul Y : 4.0 beats de distance entre haut et impact
             # y_hit est la ligne d'impact, neck_top_y est le sommet
@@ -239,9 +296,20 @@ class GameScreen(Screen):
             elif n["status"] == "missed": color = (255, 0, 0)
             else: color = COLOR_NOTE_TARGET
             
+            current_neck_w = self.neck_top_w + (self.neck_bottom_w - self.neck_top_w) * progress
+
+            # Accord : barre sur toute la largeur du manche, avec son nom
+            if n["chord"]:
+                bar = pygame.Rect(0, 0, int(current_neck_w), 40)
+                bar.center = (self.cx, int(y))
+                pygame.draw.rect(surface, color, bar, border_radius=20)
+                pygame.draw.rect(surface, (255, 255, 255), bar, 2, border_radius=20)
+                txt_c = self.font_small.render(n["note"], True, (0, 0, 0) if n["status"] == "hit" else (255, 255, 255))
+                surface.blit(txt_c, (self.cx - txt_c.get_width()//2, y - txt_c.get_height()//2))
+                continue
+
             # Position X
             visual_string_idx = 6 - n["string"]
-            current_neck_w = self.neck_top_w + (self.neck_bottom_w - self.neck_top_w) * progress
             x = (self.cx - current_neck_w//2) + (current_neck_w * (visual_string_idx / 5.0))
             
             # Dessin
@@ -255,12 +323,11 @@ class GameScreen(Screen):
             txt_f = self.font_small.render(str(n["fret"]), True, (0, 0, 0) if n["status"] == "hit" else (255, 255, 255))
             surface.blit(txt_f, (x - txt_f.get_width()//2, y - txt_f.get_height()//2))
 
-    def _draw_single_note(self, surface, pos, state, timer):
+    def _draw_single_note(self, surface, pos, state, timer, note_duration):
         """Helper pour garder le mode Arcade fonctionnel."""
-        engine = self.controller.game_engine
         string_idx, fret_idx = pos
         visual_string_idx = 6 - string_idx
-        progress = min(1.0, timer / engine.settings.note_duration)
+        progress = min(1.0, timer / note_duration)
         if state == "SUCCESS": progress = 0.9
         elif state == "MISS": progress = 0.95
         
@@ -272,12 +339,12 @@ class GameScreen(Screen):
         pygame.draw.circle(surface, color, (int(x), int(y)), 30)
         pygame.draw.circle(surface, (255, 255, 255), (int(x), int(y)), 30, 2)
 
-    def _draw_tab_helper(self, surface):
-        engine = self.controller.game_engine
-        if not engine.target_position: return
+    def _draw_tab_helper(self, surface, view: GameView):
+        chord_target = view.quest_mode and view.target_note and not view.target_position
+        if not view.target_position and not chord_target: return
 
-        string_num, fret_num = engine.target_position 
-        note_name = engine.target_note
+        string_num, fret_num = view.target_position or (None, None)
+        note_name = view.target_note
         
         panel_w = int(self.W * 0.4)
         panel_h = int(self.H * 0.15)
@@ -289,15 +356,20 @@ class GameScreen(Screen):
         pygame.draw.rect(surface, (0, 200, 200), rect, 2, border_radius=15)
         
         # 1. LA NOTE (TOUJOURS VISIBLE)
-        txt_note = self.font_score.render(f"NOTE: {note_name}", True, (255, 255, 255))
+        label = "ACCORD" if chord_target else "NOTE"
+        txt_note = self.font_score.render(f"{label}: {note_name}", True, (255, 255, 255))
         surface.blit(txt_note, (self.cx - txt_note.get_width()//2, panel_y + 10))
         
         # 2. L'AIDE (CONDITIONNELLE)
-        if engine.settings.show_helper:
+        if chord_target:
+            # Accord : pas de position unique à indiquer
+            helper_str = ""
+            txt_col = (255, 200, 50)
+        elif view.show_helper:
             # Mode Normal : On donne la solution
             helper_str = f"CORDE {string_num}   |   CASE {fret_num}"
-            txt_col = (0, 255, 0) if engine.state == "SUCCESS" else (255, 200, 50)
-            if engine.state == "MISS": txt_col = (255, 0, 0)
+            txt_col = (0, 255, 0) if view.state == "SUCCESS" else (255, 200, 50)
+            if view.state == "MISS": txt_col = (255, 0, 0)
         else:
             # Mode Aveugle : On cache la solution
             helper_str = "? ? ?"
@@ -306,32 +378,28 @@ class GameScreen(Screen):
         txt_help = self.font_tab.render(helper_str, True, txt_col)
         surface.blit(txt_help, (self.cx - txt_help.get_width()//2, panel_y + panel_h//2 + 10))
 
-    def _draw_hud(self, surface):
-        engine = self.controller.game_engine
-        stats = engine.stats
-        settings = engine.settings
-        
-        score_txt = self.font_score.render(f"{stats.score}", True, (255, 255, 0))
+    def _draw_hud(self, surface, view: GameView):
+        score_txt = self.font_score.render(f"{view.score}", True, (255, 255, 0))
         surface.blit(score_txt, (50, 50))
         
-        mult_txt = self.font_info.render(f"x{stats.multiplier}", True, (200, 200, 200))
+        mult_txt = self.font_info.render(f"x{view.multiplier}", True, (200, 200, 200))
         surface.blit(mult_txt, (50 + score_txt.get_width() + 10, 70))
         
         lbl_score = self.font_info.render("SCORE", True, (150, 150, 150))
         surface.blit(lbl_score, (50, 30))
         
-        lives_str = "♥ " * stats.lives
+        lives_str = "♥ " * view.lives
         lives_txt = self.font_score.render(lives_str, True, COLOR_HEART)
         surface.blit(lives_txt, (self.W - lives_txt.get_width() - 50, 50))
         
-        prog_str = f"NOTE: {stats.notes_played} / {settings.total_notes}"
+        prog_str = f"NOTE: {view.notes_played} / {view.total_notes}"
         prog_txt = self.font_info.render(prog_str, True, (100, 200, 255))
         surface.blit(prog_txt, (self.W - prog_txt.get_width() - 50, 110))
 
-        if engine.state == "SUCCESS":
+        if view.state == "SUCCESS":
             msg = self.font_score.render("PARFAIT !", True, (0, 255, 0))
             surface.blit(msg, (self.cx - msg.get_width()//2, 20)) # Tout en haut
-        elif engine.state == "MISS":
+        elif view.state == "MISS":
             msg = self.font_score.render("RATÉ !", True, (255, 0, 0))
             surface.blit(msg, (self.cx - msg.get_width()//2, self.H_GAME * 0.6))
 
@@ -357,11 +425,9 @@ class GameScreen(Screen):
         surface.blit(txt_out, (self.W - txt_out.get_width() - 20, self.H - 10))
         surface.blit(txt_in, (self.W - txt_in.get_width() - 20, self.H - 30))
 
-    def _draw_game_over_overlay(self, surface):
-        engine = self.controller.game_engine
-        
+    def _draw_game_over_overlay(self, surface, view: GameView):
         # Ne pas afficher l'overlay de score arcade si on est en mode quête
-        if engine.state not in ["GAME_OVER", "VICTORY"] or engine.quest_mode:
+        if view.state not in ["GAME_OVER", "VICTORY"] or view.quest_mode:
             return
             
         # Fond sombre
@@ -371,7 +437,7 @@ class GameScreen(Screen):
         surface.blit(overlay, (0, 0))
         
         # --- 1. TITRE ---
-        if engine.state == "VICTORY":
+        if view.state == "VICTORY":
             title_text = "VICTOIRE !"
             color = (0, 255, 0)
         else:
@@ -382,14 +448,14 @@ class GameScreen(Screen):
         surface.blit(txt_title, (self.cx - txt_title.get_width()//2, int(self.H * 0.1)))
         
         # --- 2. SCORE ACTUEL ---
-        txt_score = self.font_score.render(f"SCORE FINAL: {engine.stats.score}", True, (255, 255, 255))
+        txt_score = self.font_score.render(f"SCORE FINAL: {view.score}", True, (255, 255, 255))
         surface.blit(txt_score, (self.cx - txt_score.get_width()//2, int(self.H * 0.2)))
         
         # --- 3. TABLEAU DES HIGHSCORES ---
         lbl_top = self.font_info.render("--- MEILLEURS SCORES ---", True, (0, 255, 255))
         surface.blit(lbl_top, (self.cx - lbl_top.get_width()//2, int(self.H * 0.35)))
         
-        scores = engine.hs_manager.get_top_scores()
+        scores = view.top_scores
         start_y = int(self.H * 0.42)
         step_y = int(self.H * 0.05)
         
@@ -157,7 +157,8 @@ class GameSetupScreen(Screen):
         
         # 4. Go
         engine.initialized = True 
-        engine.start_game()
+        with self.controller.engine_lock:
+            engine.start_game()
         self.app.change_screen("game")
 
     def draw(self, surface):
@@ -91,10 +91,11 @@ class QuestListScreen(Screen):
         if q_data["type"] == "tuner":
             self.app.change_screen("tuner")
         else:
-            self.controller.game_engine.load_quest(
-                self.state.selected_campaign_id,
-                q_data
-            )
+            with self.controller.engine_lock:
+                self.controller.game_engine.load_quest(
+                    self.state.selected_campaign_id,
+                    q_data
+                )
             self.app.change_screen("game")
 
     def _idx_from_mouse(self, pos):
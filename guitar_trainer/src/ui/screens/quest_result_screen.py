@@ -52,7 +52,8 @@ class QuestResultScreen(Screen):
                 self.state.selected_campaign_id,
                 self.state.selected_quest_id
             )
-            self.controller.game_engine.load_quest(self.state.selected_campaign_id, q)
+            with self.controller.engine_lock:
+                self.controller.game_engine.load_quest(self.state.selected_campaign_id, q)
             self.app.change_screen("game")
 
     def _idx_from_mouse(self, pos):
@@ -1,9 +1,25 @@
 import pygame
+from dataclasses import dataclass
 from .base import Screen
 from ..widgets.knob import Knob
 import numpy as np
 import wave
 
+
+@dataclass(frozen=True)
+class StudioView:
+    """Copie des champs du moteur studio lus par le dessin d'une image (prise sous le verrou)."""
+    targets: tuple
+    target: dict | None
+    state: str
+    confirm_timer: float
+    confirm_duration: float
+    record_timer: float
+    record_duration: float
+    done_count: int
+    total_count: int
+
+
 class StudioScreen(Screen):
     def __init__(self, cfg, state, controller):
         super().__init__(cfg, state, controller)
@@ -27,7 +43,8 @@ class StudioScreen(Screen):
 
     def on_enter(self):
         self.controller.set_active_mode("studio")
-        self.controller.studio_engine.reset_recording()
+        with self.controller.engine_lock:
+            self.controller.studio_engine.reset_recording()
 
     def on_exit(self):
         self.controller.set_active_mode("game")
@@ -47,22 +64,27 @@ class StudioScreen(Screen):
             self.controller.set_audio_volume(self.knob_vol.val)
             
         if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
-                self.app.change_screen("menu")
-            elif event.key == pygame.K_RIGHT:
-                engine.next_target()
-            elif event.key == pygame.K_LEFT:
-                engine.prev_target()
-            elif event.key == pygame.K_UP:
-                self._jump_string(-1)
-            elif event.key == pygame.K_DOWN:
-                self._jump_string(1)
-            elif event.key == pygame.K_SPACE:
-                self._play_current_sample()
-            elif event.key == pygame.K_r:
-                engine.reset_recording()
-            elif event.key == pygame.K_n:
-                self._skip_to_next_undone()
+            # Le moteur studio est aussi mis à jour par le thread d'analyse
+            with self.controller.engine_lock:
+                self._handle_key(event, engine)
+
+    def _handle_key(self, event, engine):
+        if event.key == pygame.K_ESCAPE:
+            self.app.change_screen("menu")
+        elif event.key == pygame.K_RIGHT:
+            engine.next_target()
+        elif event.key == pygame.K_LEFT:
+            engine.prev_target()
+        elif event.key == pygame.K_UP:
+            self._jump_string(-1)
+        elif event.key == pygame.K_DOWN:
+            self._jump_string(1)
+        elif event.key == pygame.K_SPACE:
+            self._play_current_sample()
+        elif event.key == pygame.K_r:
+            engine.reset_recording()
+        elif event.key == pygame.K_n:
+            self._skip_to_next_undone()
 
 
     def _play_current_sample(self):
@@ -106,22 +128,43 @@ class StudioScreen(Screen):
         pass
 
     def draw(self, surface):
-        surface.fill((15, 18, 25))
+        # Le thread d'analyse modifie le moteur : copie sous le verrou, dessin hors verrou
+        with self.controller.engine_lock:
+            view = self._snapshot()
+        self._draw_frame(surface, view)
+
+    def _snapshot(self) -> StudioView:
         engine = self.controller.studio_engine
         target = engine.get_current_target()
         done_count, total_count = engine.get_progress()
+        return StudioView(
+            # Le moteur marque les cibles "done" en place : copie de chaque cible
+            targets=tuple(dict(t) for t in engine.targets),
+            target=dict(target) if target else None,
+            state=engine.state,
+            confirm_timer=engine.confirm_timer,
+            confirm_duration=engine.confirm_duration,
+            record_timer=engine.record_timer,
+            record_duration=engine.record_duration,
+            done_count=done_count,
+            total_count=total_count
+        )
 
-        self._draw_title(surface, done_count, total_count)
-        self._draw_grid(surface, engine)
+    def _draw_frame(self, surface, view: StudioView):
+        surface.fill((15, 18, 25))
+        target = view.target
+
+        self._draw_title(surface, view.done_count, view.total_count)
+        self._draw_grid(surface, view)
 
         if not target:
             txt = self.font_main.render("Tous les samples sont enregistrés !", True, (100, 255, 100))
             surface.blit(txt, (self.W // 2 - txt.get_width() // 2, int(self.H * 0.5)))
             return
 
-        self._draw_target(surface, target, engine)
-        self._draw_status(surface, engine)
-        self._draw_progress_bar(surface, engine)
+        self._draw_target(surface, target, view)
+        self._draw_status(surface, view)
+        self._draw_progress_bar(surface, view)
         self._draw_diagnostics(surface)
         self._draw_hints(surface)
         
@@ -138,7 +181,7 @@ class StudioScreen(Screen):
         counter = self.font_info.render(f"{done} / {total} enregistrés", True, (150, 150, 150))
         surface.blit(counter, (self.W - counter.get_width() - int(self.W * 0.05), int(self.H * 0.04)))
 
-    def _draw_grid(self, surface, engine):
+    def _draw_grid(self, surface, view: StudioView):
         grid_x = int(self.W * 0.05)
         grid_y = int(self.H * 0.12)
         cell_w = int(self.W * 0.035)
@@ -147,15 +190,15 @@ class StudioScreen(Screen):
 
         strings_in_grid = [6, 5, 4, 3, 2, 1]
         max_fret = 0
-        for t in engine.targets:
+        for t in view.targets:
             if t["fret"] > max_fret:
                 max_fret = t["fret"]
 
-        target = engine.get_current_target()
+        target = view.target
         target_key = (target["string"], target["fret"]) if target else None
 
         lookup = {}
-        for t in engine.targets:
+        for t in view.targets:
             lookup[(t["string"], t["fret"])] = t
 
         string_labels = ["E2", "A2", "D3", "G3", "B3", "E4"]
@@ -191,7 +234,7 @@ class StudioScreen(Screen):
                     fret_txt = self.font_grid.render(str(col), True, (180, 180, 180))
                     surface.blit(fret_txt, (rect.centerx - fret_txt.get_width() // 2, rect.centery - fret_txt.get_height() // 2))
 
-    def _draw_target(self, surface, target, engine):
+    def _draw_target(self, surface, target, view: StudioView):
         y = int(self.H * 0.45)
         txt = self.font_main.render(
             f"Corde {target['string']}  |  Case {target['fret']}  |  {target['note']}",
@@ -199,21 +242,21 @@ class StudioScreen(Screen):
         )
         surface.blit(txt, (self.W // 2 - txt.get_width() // 2, y))
 
-        if target["done"] and engine.state != "RECORDING":
+        if target["done"] and view.state != "RECORDING":
             done_txt = self.font_info.render("(déjà enregistré — R pour refaire)", True, (100, 200, 100))
             surface.blit(done_txt, (self.W // 2 - done_txt.get_width() // 2, y + int(self.H * 0.07)))
 
-    def _draw_status(self, surface, engine):
+    def _draw_status(self, surface, view: StudioView):
         y = int(self.H * 0.58)
 
-        if engine.state == "WAITING":
-            if engine.confirm_timer > 0:
+        if view.state == "WAITING":
+            if view.confirm_timer > 0:
                 txt = "Confirmation..."
                 color = (255, 200, 50)
             else:
                 txt = "Joue la note juste et tiens-la"
                 color = (120, 120, 120)
-        elif engine.state == "RECORDING":
+        elif view.state == "RECORDING":
             txt = "ENREGISTREMENT"
             color = (255, 50, 50)
         else:
@@ -223,22 +266,22 @@ class StudioScreen(Screen):
         rendered = self.font_info.render(txt, True, color)
         surface.blit(rendered, (self.W // 2 - rendered.get_width() // 2, y))
 
-    def _draw_progress_bar(self, surface, engine):
+    def _draw_progress_bar(self, surface, view: StudioView):
         bar_x = int(self.W * 0.2)
         bar_y = int(self.H * 0.66)
         bar_w = int(self.W * 0.6)
         bar_h = int(self.H * 0.03)
         bar_rect = pygame.Rect(bar_x, bar_y, bar_w, bar_h)
 
-        if engine.state == "WAITING" and engine.confirm_timer > 0:
-            progress = min(1.0, engine.confirm_timer / engine.confirm_duration)
+        if view.state == "WAITING" and view.confirm_timer > 0:
+            progress = min(1.0, view.confirm_timer / view.confirm_duration)
             pygame.draw.rect(surface, (40, 40, 50), bar_rect, border_radius=4)
             fill = pygame.Rect(bar_x, bar_y, int(bar_w * progress), bar_h)
             pygame.draw.rect(surface, (255, 200, 50), fill, border_radius=4)
             pygame.draw.rect(surface, (100, 100, 100), bar_rect, 1, border_radius=4)
 
-        elif engine.state == "RECORDING":
-            progress = min(1.0, engine.record_timer / engine.record_duration)
+        elif view.state == "RECORDING":
+            progress = min(1.0, view.record_timer / view.record_duration)
             pygame.draw.rect(surface, (40, 40, 50), bar_rect, border_radius=4)
             fill = pygame.Rect(bar_x, bar_y, int(bar_w * progress), bar_h)
             pygame.draw.rect(surface, (255, 50, 50), fill, border_radius=4)
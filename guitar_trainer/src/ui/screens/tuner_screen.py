@@ -87,6 +87,8 @@ class TunerScreen(Screen):
         self.stability_counters = {}
         
     def on_enter(self):
+        # Le spectrogramme n'est calculé que tant que cet écran est affiché
+        self.controller.subscribe("spectrum")
         manager = self.controller.campaign_manager
         camp_id = self.state.selected_campaign_id
         quest_id = self.state.selected_quest_id
@@ -102,6 +104,9 @@ class TunerScreen(Screen):
                 return
         
         self.quest_mode = False
+
+    def on_exit(self):
+        self.controller.unsubscribe("spectrum")
         
     def handle_event(self, event):
         # Gestion des potards
@@ -1,45 +1,30 @@
 import pygame
-import math
 import numpy as np
 
 class SpectrogramWidget:
-    def __init__(self, rect: pygame.Rect, max_history: int, num_bins: int = 120):
+    def __init__(self, rect: pygame.Rect, max_history: int):
         self.rect = rect
         self.max_history = max_history
-        self.num_bins = num_bins
-        # Pré-calcul de la hauteur d'un bin pour éviter de le refaire à chaque frame
-        self.bin_height = self.rect.height / self.num_bins
 
-    def draw(self, surface: pygame.Surface, history: list[np.ndarray]) -> None:
-        if not history:
+    def draw(self, surface: pygame.Surface, history: np.ndarray) -> None:
+        """`history` : tableau (n, n_bins) en bins logarithmiques, du plus ancien au plus récent."""
+        if len(history) == 0:
             return
 
         # Largeur d'une colonne (dépend de la taille de l'historique max définie dans l'app)
         # On utilise max_history pour que le défilement soit fluide (la largeur ne saute pas au début)
         col_width = self.rect.width / self.max_history
-        
-        for i, spec in enumerate(history):
-            x = self.rect.x + i * col_width
-            
-            # On parcourt les fréquences (bins)
-            for j in range(self.num_bins):
-                # Protection si le spectre est plus petit que prévu
-                val = spec[j] if j < len(spec) else 0
-                
-                # Calcul de l'intensité (logarithmique pour mieux voir les sons faibles)
-                intensity = min(255, int(math.log1p(val) * 50))
-                
-                if intensity > 10:
-                    # Couleur : Cyan sombre -> Bleu -> Blanc
-                    color = (intensity // 2, intensity, intensity // 4)
-                    
-                    # Position Y (le bas du rectangle correspond aux basses fréquences)
-                    y = self.rect.bottom - (j * self.bin_height)
-                    
-                    # Dessin du point (rect)
-                    # +1 sur les dimensions pour éviter les micro-espaces noirs entre les rectangles
-                    pygame.draw.rect(
-                        surface, 
-                        color, 
-                        (x, y - self.bin_height, col_width + 1, self.bin_height + 1)
-                    )
\ No newline at end of file
+        width = max(1, int(round(len(history) * col_width)))
+
+        # Calcul de l'intensité (logarithmique pour mieux voir les sons faibles), pour tout
+        # l'historique en une passe
+        intensity = np.minimum(255, np.log1p(history) * 50).astype(np.uint8)
+        intensity[intensity <= 10] = 0
+
+        # Couleur : Cyan sombre -> Bleu -> Blanc. Image (x = temps, y = fréquence), le bas
+        # correspondant aux basses fréquences ; le noir (intensité faible) reste transparent
+        pixels = np.stack([intensity // 2, intensity, intensity // 4], axis=-1)[:, ::-1]
+        image = pygame.surfarray.make_surface(np.ascontiguousarray(pixels))
+        image.set_colorkey((0, 0, 0))
+        image = pygame.transform.scale(image, (width, self.rect.height))
+        surface.blit(image, (self.rect.x, self.rect.y))
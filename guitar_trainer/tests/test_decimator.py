@@ -0,0 +1,19 @@
+import numpy as np
+
+from src.analysis.decimator import Decimator
+
+
+def test_empty_block_returns_empty_output():
+    decimator = Decimator(4)
+    out = decimator.process(np.zeros(0, dtype=np.float32))
+    assert out.dtype == np.float32
+    assert len(out) == 0
+
+
+def test_empty_block_keeps_stream_continuous():
+    signal = np.sin(2 * np.pi * 440.0 * np.arange(4096) / 44100.0).astype(np.float32)
+    reference = Decimator(4).process(signal)
+
+    decimator = Decimator(4)
+    parts = [decimator.process(signal[:1000]), decimator.process(signal[:0]), decimator.process(signal[1000:])]
+    np.testing.assert_allclose(np.concatenate(parts), reference, atol=1e-6)
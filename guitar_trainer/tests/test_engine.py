@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from src.core.config import AppConfig
+from src.game.engine import GameEngine
+
+_BLOCK = 512
+
+
+def _quest(beat=1.0):
+    # A2 (corde 5, à vide) attendu sur `beat`, à 120 BPM
+    return {"id": "test", "params": {"tempo": 120, "tolerance_timing": 0.25, "tolerance_pitch": 10,
+                                     "max_lives": 0, "sequence": [{"beat": beat, "string": 5, "fret": 0}]}}
+
+
+def _engine():
+    cfg = AppConfig(hit_detector="goertzel")
+    manager = SimpleNamespace(save_quest_score=lambda *a: None, unlock_quest=lambda *a: None)
+    engine = GameEngine(cfg, SimpleNamespace(campaign_manager=manager))
+    engine.load_quest("test", _quest())
+    return engine
+
+
+def _sample(engine, beat):
+    # Décompte de 4 beats avant le beat 0, flux ancré au premier bloc
+    return int((beat + 4.0) * engine.cfg.sample_rate * 60.0 / 120.0)
+
+
+def _play(engine, events, until_beat):
+    """events : liste (beat de l'attaque, note jouée) ; la note est reconnue 2 blocs après l'attaque."""
+    attacks = [(_sample(engine, beat), note) for beat, note in events]
+    for i in range(0, _sample(engine, until_beat), _BLOCK):
+        onset = next((s for s, _ in attacks if i <= s < i + _BLOCK), None)
+        heard = [note for s, note in attacks if s + 2 * _BLOCK <= i]
+        features = SimpleNamespace(sample_index=i, samples=np.zeros(_BLOCK, dtype=np.float32),
+                                   onset_index=onset, note_name=None, cents=0.0, chord=None,
+                                   target_matches=(heard[-1],) if heard else (),
+                                   template_targets=(), position_matches=(), pitch_frames=())
+        engine.update(features, _BLOCK / engine.cfg.sample_rate)
+
+
+def test_hit_timed_at_its_onset():
+    engine = _engine()
+    _play(engine, [(1.05, "A2")], until_beat=3.0)
+
+    assert engine.stats.correct_notes == 1
+    assert abs(engine.hit_history[0]["x"] * 0.25 - 0.05) < 0.01
+
+
+def test_earlier_onset_of_another_note_does_not_time_a_late_hit():
+    engine = _engine()
+    # Mauvaise note à temps, puis la bonne note trop tard (+0.45 beat, tolérance 0.25)
+    _play(engine, [(1.0, "D#3"), (1.45, "A2")], until_beat=3.0)
+
+    assert engine.stats.correct_notes == 0
+    assert engine.stats.missed_notes == 1
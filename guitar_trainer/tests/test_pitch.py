@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from src.analysis.pitch import NOTE_NAMES, PitchTracker, note_name_to_hz
+from src.core.config import AppConfig
+from src.core.types import AudioBlock
+
+_NOTES = [f"{name}{octave}" for octave in range(2, 7) for name in NOTE_NAMES]
+_GUITAR_RANGE = _NOTES[_NOTES.index("E2"):_NOTES.index("D6") + 1]
+
+
+def _tone(freq, sample_rate, n, partials=((1, 1.0), (2, 0.5), (3, 0.3), (4, 0.2))):
+    t = np.arange(n) / sample_rate
+    x = sum(a * np.sin(2 * np.pi * freq * h * t + h) for h, a in partials if freq * h < sample_rate / 2)
+    return (0.3 * x).astype(np.float32)
+
+
+def _track(tracker, signal, block_size=512):
+    results = []
+    for i in range(0, len(signal), block_size):
+        block = AudioBlock(samples=signal[i:i + block_size], sample_rate=tracker.cfg.sample_rate,
+                           timestamp=i / tracker.cfg.sample_rate, sample_index=i)
+        results += tracker.process(block)
+    return results
+
+
+@pytest.mark.parametrize("note", _GUITAR_RANGE)
+def test_cents_accuracy_across_guitar_range(note):
+    cfg = AppConfig(pitch_backend="numpy")
+    tracker = PitchTracker(cfg)
+    assert tracker.decimation > 1
+
+    freq = note_name_to_hz(note)
+    result = _track(tracker, _tone(freq, cfg.sample_rate, cfg.sample_rate // 2))[-1]
+
+    assert result.note_name == note
+    assert abs(1200 * np.log2(result.frequency / freq)) < 1.0
+
+
+def test_low_e_with_weak_fundamental_keeps_its_octave():
+    cfg = AppConfig(pitch_backend="numpy")
+    tracker = PitchTracker(cfg)
+    assert tracker.short_o is not None
+
+    # Corde de mi grave : fondamentale faible, harmoniques 2 et 3 dominants
+    signal = _tone(note_name_to_hz("E2"), cfg.sample_rate, cfg.sample_rate // 2,
+                   partials=((1, 0.1), (2, 1.0), (3, 1.0), (4, 0.5)))
+    results = [r for r in _track(tracker, signal) if r.sample_index >= cfg.sample_rate // 10]
+
+    assert results
+    assert {r.note_name for r in results} == {"E2"}
@@ -0,0 +1,50 @@
+import numpy as np
+
+from src.audio.ringbuffer import AudioRingBuffer, OVERFLOW_DROP_NEWEST, OVERFLOW_DROP_OLDEST
+
+
+def _fill(ring, count, block_size=8):
+    for i in range(count):
+        ring.push(np.full(block_size, i, dtype=np.float32), sample_index=i * block_size, timestamp=float(i))
+
+
+def test_drop_oldest_keeps_full_capacity():
+    ring = AudioRingBuffer(4, 8, 44100, OVERFLOW_DROP_OLDEST)
+    _fill(ring, 10)
+
+    # Une perte par push en trop, comptée avant même la lecture
+    assert ring.overflows == 6
+    assert ring.available() == 4
+
+    blocks = ring.pop_batch(10)
+    assert [b.sample_index // 8 for b in blocks] == [6, 7, 8, 9]
+    assert [float(b.samples[0]) for b in blocks] == [6.0, 7.0, 8.0, 9.0]
+    assert ring.overflows == 6
+    assert ring.pop() is None
+
+
+def test_drop_oldest_full_without_overflow():
+    ring = AudioRingBuffer(4, 8, 44100, OVERFLOW_DROP_OLDEST)
+    _fill(ring, 4)
+
+    assert ring.overflows == 0
+    assert [b.sample_index // 8 for b in ring.pop_batch(10)] == [0, 1, 2, 3]
+
+
+def test_drop_oldest_discards_slot_claimed_during_read():
+    ring = AudioRingBuffer(4, 8, 44100, OVERFLOW_DROP_OLDEST)
+    _fill(ring, 4)
+    # Le producteur a réservé le slot du plus ancien bloc (push en cours) : sa copie est jetée
+    ring._claim_count = ring._write_count + 1
+
+    block = ring.pop()
+    assert block.sample_index // 8 == 1
+    assert ring.overflows == 1
+
+
+def test_drop_newest_keeps_first_blocks():
+    ring = AudioRingBuffer(4, 8, 44100, OVERFLOW_DROP_NEWEST)
+    _fill(ring, 10)
+
+    assert ring.overflows == 6
+    assert [b.sample_index // 8 for b in ring.pop_batch(10)] == [0, 1, 2, 3]